@@ -2,28 +2,42 @@
 # Published under the standard MIT License.
 # Full text available at: https://opensource.org/licenses/MIT
 
+from typing import TYPE_CHECKING, Any
+
 from .config import DEFAULT_PROCESSORS, configure
-from .destination import CaptureDestination, Destination, TextIODestination
+from .destination import CaptureDestination, Destination, FlightRecorderDestination, TextIODestination
 from .errors import LogladyError
+from .levels import LevelTree
 from .logger import Logger
 from .magics import bind, catch, debug, error, exception, flush, info, log, logger, success, trace, warn, warning
 from .manager import Manager
 from .processors import add_call_info, add_exception_and_stack_info, add_thread_info, add_timestamp, fancy_prefix_icon
-from .rich import RichConsoleDestination
+from .routing import Filter, FilteredDestination
+from .switches import CallsiteSwitches
 from .transport import SyncTransport, ThreadedTransport, Transport
 from .types import Processor, Record
 
+if TYPE_CHECKING:
+    from .rich import RichConsoleDestination
+    from .sqlite import SQLiteDestination
+
 __all__ = [
     "DEFAULT_PROCESSORS",
     # Types & classes
+    "CallsiteSwitches",
     "CaptureDestination",
     "Destination",
+    "Filter",
+    "FilteredDestination",
+    "FlightRecorderDestination",
+    "LevelTree",
     "Logger",
     "LogladyError",
     "Manager",
     "Processor",
     "Record",
     "RichConsoleDestination",
+    "SQLiteDestination",
     "SyncTransport",
     "TextIODestination",
     "ThreadedTransport",
@@ -50,3 +64,20 @@ __all__ = [
     "warn",
     "warning",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    # Rich (and Pygments, through it) takes longer to import than the rest of loglady put together, so it's only
+    # imported once something actually uses the console destination. Likewise for sqlite3 and the query CLI.
+    if name == "RichConsoleDestination":
+        from .rich import RichConsoleDestination  # noqa: PLC0415
+
+        return RichConsoleDestination
+
+    if name == "SQLiteDestination":
+        from .sqlite import SQLiteDestination  # noqa: PLC0415
+
+        return SQLiteDestination
+
+    msg = f"module {__name__!r} has no attribute {name!r}"
+    raise AttributeError(msg)
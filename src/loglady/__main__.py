@@ -6,9 +6,13 @@
 
 Run using:
     python3 -m loglady
+
+This also hosts the query tool for databases written by SQLiteDestination:
+    python3 -m loglady query logs.sqlite --level error --since 10m
 """
 
 import datetime
+import sys
 from decimal import Decimal
 
 import loglady
@@ -85,6 +89,11 @@ class DemoCallsite:
 
 
 if __name__ == "__main__":
+    if sys.argv[1:2] == ["query"]:
+        from loglady.sqlite import main
+
+        sys.exit(main(sys.argv[2:]))
+
     mgr = loglady.configure(
         processors=[*loglady.DEFAULT_PROCESSORS, add_mock_timestamp],
     )
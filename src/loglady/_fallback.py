@@ -7,19 +7,22 @@
 from __future__ import annotations
 
 import sys
+import threading
 import typing
 import warnings
+from collections import deque
+from collections.abc import Iterator
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Final, Literal, override
+from typing import IO, Final, Literal, override
 
-from .destination import CaptureDestination, Destination, LazyDestination, TextIODestination
+from .destination import Destination, LazyDestination, TextIODestination, approximate_size
 from .errors import InvalidFallbackModeError, NotConfiguredError
 from .manager import Manager
 from .processors import add_timestamp
 from .transport import SyncTransport
 from .types import Record
-from .warnings import NotConfiguredWarning
+from .warnings import FallbackBufferWarning, NotConfiguredWarning
 
 FallbackMode = Literal["buffer", "stderr", "warn", "error"]
 
@@ -35,9 +38,12 @@ def validate_fallback_mode(mode: str) -> FallbackMode:
 @dataclass(slots=True, kw_only=True)
 class Fallback:
     mode: Final[FallbackMode]
+    buffer_limit: int = 10_000
+    buffer_max_bytes: int = 16 * 1024 * 1024
+    buffer_max_spill_bytes: int = 256 * 1024 * 1024
 
     _stderr_destination: Destination = field(init=False)
-    _capture_destination: CaptureDestination = field(init=False)
+    _capture_destination: _SpillingBuffer = field(init=False)
     _warn_destination: _WarnDestination = field(init=False)
     _buffered_manager: Manager = field(init=False)
     _stderr_manager: Manager = field(init=False)
@@ -46,7 +52,9 @@ class Fallback:
 
     def __post_init__(self):
         self._stderr_destination = LazyDestination(lambda: TextIODestination(io=sys.stderr))
-        self._capture_destination = CaptureDestination()
+        self._capture_destination = _SpillingBuffer(
+            limit=self.buffer_limit, max_bytes=self.buffer_max_bytes, max_spill_bytes=self.buffer_max_spill_bytes
+        )
         self._warn_destination = _WarnDestination(
             msg="loglady.log() called before loglady.configure()", next_destination=self._stderr_destination
         )
@@ -84,12 +92,21 @@ class Fallback:
 
     def drain_to_new_manager(self, manager: Manager):
         src = self._capture_destination
-        if not src.records:
+        if not src:
             return
 
-        for record in src.records:
+        for record in src.drain():
             manager.relay(record)
 
+        if src.discarded_records:
+            manager.relay(
+                dict(
+                    level="warning",
+                    msg=f"{src.discarded_records} records logged before loglady.configure() were discarded because "
+                    "the buffer was full",
+                )
+            )
+
         src.reset()
         manager.flush()
 
@@ -98,6 +115,125 @@ class Fallback:
         self.drain_to_new_manager(self._warn_manager)
 
 
+class _SpillingBuffer(Destination):
+    """Holds records until they can be drained to a real manager.
+
+    The first `limit` records, up to `max_bytes` (estimated with
+    sys.getsizeof()), are kept in memory. Records after that are pickled into
+    an anonymous temporary file, and once that's `max_spill_bytes` long, further
+    records are discarded and counted. drain() yields the records in the order
+    they were logged, reading the file back a record at a time.
+
+    Records that can't be pickled, like those holding a traceback, are kept in
+    memory and the file only holds their position. They count towards
+    `max_bytes` along with the records at the front of the buffer, and once
+    that's used up they're discarded too.
+    """
+
+    def __init__(self, *, limit: int, max_bytes: int, max_spill_bytes: int):
+        super().__init__()
+        self.limit = limit
+        self.max_bytes = max_bytes
+        self.max_spill_bytes = max_spill_bytes
+        self.records: deque[Record] = deque()
+        self.discarded_records = 0
+        self.spilled_records = 0
+        self._bytes = 0
+        self._spill: IO[bytes] | None = None
+        self._spill_bytes = 0
+        self._held: list[Record] = []
+        self._lock = threading.Lock()
+
+    @override
+    def __call__(self, record: Record) -> None:
+        with self._lock:
+            if self._spill is None:
+                size = approximate_size(record)
+                if len(self.records) < self.limit and self._bytes + size <= self.max_bytes:
+                    self.records.append(record)
+                    self._bytes += size
+                    return
+
+            self._spill_record(record)
+
+    def _spill_record(self, record: Record):
+        # Imported here since buffering this many records before configure() is rare.
+        import pickle  # noqa: PLC0415
+
+        held_size = 0
+        try:
+            data = pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:  # noqa: BLE001
+            held_size = approximate_size(record)
+            data = pickle.dumps(len(self._held), protocol=pickle.HIGHEST_PROTOCOL)
+
+        if self._spill_bytes + len(data) > self.max_spill_bytes or self._bytes + held_size > self.max_bytes:
+            self.discarded_records += 1
+            return
+
+        if held_size:
+            self._held.append(record)
+            self._bytes += held_size
+
+        if self._spill is None:
+            import tempfile  # noqa: PLC0415
+
+            self._spill = tempfile.TemporaryFile()  # noqa: SIM115
+
+        _ = self._spill.write(data)
+        self._spill_bytes += len(data)
+        self.spilled_records += 1
+
+    def __len__(self) -> int:
+        return len(self.records) + self.spilled_records + self.discarded_records
+
+    def drain(self) -> Iterator[Record]:
+        """Yield every buffered record, oldest first. Call reset() afterwards."""
+        with self._lock:
+            records, self.records = self.records, deque()
+            spill, self._spill = self._spill, None
+            held, self._held = self._held, []
+            self.spilled_records = self._spill_bytes = self._bytes = 0
+
+        while records:
+            yield records.popleft()
+
+        if spill is None:
+            return
+
+        import pickle  # noqa: PLC0415
+
+        next_held = 0
+        with spill:
+            _ = spill.seek(0)
+            while True:
+                try:
+                    item = pickle.load(spill)
+                except EOFError:
+                    break
+                except Exception as err:  # noqa: BLE001
+                    # The rest of the file can't be trusted, but the records held in memory are still good.
+                    warnings.warn(FallbackBufferWarning(error=err), stacklevel=1)
+                    yield from held[next_held:]
+                    break
+
+                if type(item) is int:
+                    next_held = item + 1
+                    yield held[item]
+                else:
+                    yield item
+
+    def reset(self):
+        """Throw away any buffered records."""
+        with self._lock:
+            if self._spill is not None:
+                self._spill.close()
+            self.records.clear()
+            self._spill = None
+            self._held = []
+            self.discarded_records = self.spilled_records = self._spill_bytes = self._bytes = 0
+
+
 _WARNING_SKIP_PREFIXES = (str(Path(__file__).parent),)
 
 
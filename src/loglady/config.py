@@ -8,12 +8,15 @@ This global config is used by magics (the top-level loglady.info, etc.), and
 should be configured at application startup.
 """
 
+from collections.abc import Mapping
+
 from . import manager_stack
 from ._excepthook import install_excepthook, is_repl
 from .destination import DestinationList
+from .levels import LevelTree
 from .manager import Manager
 from .processors import add_call_info, add_exception_and_stack_info, add_thread_info, add_timestamp, fancy_prefix_icon
-from .rich import RichConsoleDestination
+from .switches import CallsiteSwitches
 from .transport import SyncTransport, ThreadedTransport, Transport
 from .types import ProcessorList
 
@@ -31,6 +34,8 @@ def configure(
     transport: Transport | None = None,
     processors: ProcessorList = DEFAULT_PROCESSORS,
     destinations: DestinationList | None = None,
+    levels: Mapping[str, str] | None = None,
+    switches: CallsiteSwitches | None = None,
     once: bool = False,
     install_hook: bool = True,
 ) -> Manager:
@@ -43,6 +48,13 @@ def configure(
     This creates a Manager instance and start()s it so that any background
     stuff can happen. It also installs an atexit() handler to call the Manager's
     stop() to ensure all logs are written before exit.
+
+    `levels` sets the minimum level for named loggers, for example
+    `{"db": "warning", "db.pool": "debug"}`. They can be changed later through
+    the returned Manager's `levels`.
+
+    `switches` drops debug records from callsites that haven't been switched
+    on, see CallsiteSwitches.
     """
     if once and manager_stack.has_valid_manager():
         return manager_stack.current()
@@ -55,6 +67,9 @@ def configure(
             transport.start()
 
     if destinations is None:
+        # Imported here so that processes that never use the console don't pay for importing Rich.
+        from .rich import RichConsoleDestination  # noqa: PLC0415
+
         destinations = [RichConsoleDestination()]
 
     if not transport.destinations:
@@ -63,6 +78,8 @@ def configure(
     mgr = Manager(
         transport=transport,
         processors=processors,
+        levels=LevelTree(levels),
+        switches=switches,
     )
 
     manager_stack.push(mgr)
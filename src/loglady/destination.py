@@ -4,13 +4,25 @@
 
 from __future__ import annotations
 
-from collections import deque
-from collections.abc import Callable, Sequence
-from dataclasses import InitVar, dataclass, field
+import datetime
+import json
+import re
+import string
+import sys
+import traceback
+from collections import Counter, deque
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from dataclasses import dataclass, field
 from functools import cached_property
-from typing import Protocol, override
+from json.encoder import encode_basestring
+from types import FrameType
+from typing import Any, Protocol, override
+from warnings import warn
 
+from .errors import InvalidTemplateError
+from .interning import CALLSITES, MESSAGES, CallsiteRegistry, MessageRegistry
 from .types import Record
+from .warnings import DestinationErrorWarning
 
 
 class Destination(Protocol):
@@ -24,6 +36,17 @@ class Destination(Protocol):
         """Output the given record to the destination."""
         ...
 
+    def batch(self, records: Sequence[Record]) -> None:
+        """Output several records at once. Transports use this to hand over everything they've drained from their
+        queue in one go, so destinations that can write in bulk should override it.
+
+        A record that fails to output is skipped with a warning, so it doesn't take the rest of the batch with it."""
+        for record in records:
+            try:
+                self(record)
+            except Exception as err:  # noqa: BLE001
+                warn(DestinationErrorWarning(destination=self, error=err), stacklevel=1)
+
 
 type DestinationList = Sequence[Destination]
 
@@ -50,6 +73,18 @@ class TextIODestination(Destination):
         text = self.formatter(record)
         _ = self.io.write(text)
 
+    @override
+    def batch(self, records: Sequence[Record]) -> None:
+        # Each record is formatted on its own, so one that fails to format doesn't take the rest of the batch with it.
+        formatter = self.formatter
+        texts: list[str] = []
+        for record in records:
+            try:
+                texts.append(formatter(record))
+            except Exception as err:  # noqa: BLE001
+                warn(DestinationErrorWarning(destination=self, error=err), stacklevel=1)
+        _ = self.io.write("".join(texts))
+
     @override
     def flush(self):
         self.io.flush()
@@ -71,30 +106,453 @@ class PlainFormatter:
         return f"{level}: {msg} {record=!r}\n"
 
 
+class TemplateFormatter:
+    """Formats records using a str.format()-style template, for example:
+
+        TemplateFormatter("{timestamp:%H:%M:%S} {level:>7} {msg} {extra}")
+
+    Each field is looked up in the record and formatted with its format spec
+    and conversion, if any. Missing fields are left empty. There are two
+    special fields:
+
+    - timestamp, when its format spec contains a "%", is formatted with
+      strftime(). The formatted time is reused for records logged within the
+      same second.
+    - extra is all of the record's fields that aren't used elsewhere in the
+      template, as `key=value` pairs.
+
+    The template is parsed once and compiled into a function that only looks
+    up the fields the template uses.
+    """
+
+    def __init__(self, template: str):
+        super().__init__()
+        self.template = template
+        self._format = _compile_template(template)
+
+    def __call__(self, record: Record) -> str:
+        return self._format(record)
+
+
+def _compile_template(template: str) -> Callable[[Record], str]:
+    try:
+        parsed = list(string.Formatter().parse(template))
+    except ValueError as err:
+        raise InvalidTemplateError(template=template, reason=str(err)) from None
+
+    used_keys = {name for _, name, _, _ in parsed if name and name != "extra"}
+    namespace: dict[str, Any] = {"_extra": _ExtraFields(frozenset(used_keys))}
+    lookups: list[str] = []
+    parts: list[str] = []
+
+    for n, (literal, name, spec, conversion) in enumerate(parsed):
+        if literal:
+            parts.append(repr(literal))
+        if name is None:
+            continue
+        if not name.isidentifier():
+            raise InvalidTemplateError(template=template, reason=f"field {name!r} must be the name of a record key")
+        if spec and "{" in spec:
+            raise InvalidTemplateError(template=template, reason=f"field {name!r} can't have nested fields")
+        if conversion not in {None, "s", "r", "a"}:
+            raise InvalidTemplateError(template=template, reason=f"unknown conversion {conversion!r}")
+
+        if name == "extra":
+            parts.append("_extra(record)")
+            continue
+
+        value = f"v{n}"
+        lookups.append(f"    {value} = get({name!r})")
+
+        # Missing fields are left empty, but still padded so that columns line up.
+        missing = ""
+
+        if name == "timestamp" and spec and "%" in spec:
+            namespace[f"strftime{n}"] = _StrftimeBySecond(spec)
+            expr = f"strftime{n}({value})"
+        else:
+            if conversion == "r":
+                expr = f"repr({value})"
+            elif conversion == "a":
+                expr = f"ascii({value})"
+            elif conversion == "s" or not spec:
+                expr = f"str({value})"
+            else:
+                expr = value
+            if spec:
+                namespace[f"spec{n}"] = spec
+                expr = f"format({expr}, spec{n})"
+                missing = _format_missing(spec)
+
+        parts.append(f"({missing!r} if {value} is None else {expr})")
+
+    parts.append(repr("\n"))
+    source = "\n".join(
+        [
+            "def format_record(record):",
+            "    get = record.get",
+            *lookups,
+            f"    return ''.join(({', '.join(parts)},))",
+        ]
+    )
+    exec(source, namespace)
+    return namespace["format_record"]
+
+
+def _format_missing(spec: str) -> str:
+    try:
+        return format("", spec)
+    except ValueError:
+        return ""
+
+
+class _StrftimeBySecond:
+    """Formats datetimes with strftime(), reusing the result for datetimes within the same second."""
+
+    def __init__(self, format: str):
+        super().__init__()
+        self.format = format
+        # %f is microseconds, so the result can't be reused.
+        self._cacheable = "%f" not in format
+        self._last: tuple[tuple[Any, ...] | None, str] = (None, "")
+
+    def __call__(self, timestamp: datetime.datetime) -> str:
+        if not self._cacheable:
+            return timestamp.strftime(self.format)
+
+        # Building this tuple is several times cheaper than timestamp.replace(microsecond=0).
+        t = timestamp
+        second = (t.second, t.minute, t.hour, t.day, t.month, t.year, t.tzinfo)
+        last_second, text = self._last
+        if second != last_second:
+            text = timestamp.strftime(self.format)
+            self._last = (second, text)
+        return text
+
+
+class _ExtraFields:
+    def __init__(self, used_keys: frozenset[str]):
+        super().__init__()
+        self.used_keys = used_keys
+
+    def __call__(self, record: Record) -> str:
+        used_keys = self.used_keys
+        return " ".join([f"{key}={value!r}" for key, value in record.items() if key not in used_keys])
+
+
+class LogfmtFormatter:
+    """Formats records as logfmt, i.e. `key=value` pairs separated by spaces.
+
+    The timestamp, level, and msg come first, followed by the rest of the
+    record's fields in the order they were added. Values are only quoted
+    (and escaped) when they contain characters outside of a small set of safe
+    characters. Timestamps are written in ISO 8601 format, with everything but
+    the microseconds reused for timestamps within the same second,
+    exceptions are written as their type and message, and stacktraces are
+    written as the formatted stack.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._timestamps = _IsoformatBySecond()
+
+    def __call__(self, record: Record) -> str:
+        parts: list[str] = []
+
+        if (timestamp := record.get("timestamp")) is not None:
+            parts.append(f"timestamp={self._timestamps(timestamp)}")
+
+        for key in ("level", "msg"):
+            if (value := record.get(key)) is not None:
+                parts.append(f"{key}={_logfmt_value(value)}")
+
+        keys = _LOGFMT_KEYS
+        for key, value in record.items():
+            if key in _LOGFMT_LEADING_KEYS:
+                continue
+            # Most values are strings and numbers, so handle those inline.
+            kind = type(value)
+            if kind is str:
+                text = value if value and _LOGFMT_UNSAFE.search(value) is None else encode_basestring(value)
+            elif kind is int or kind is float:
+                text = repr(value)
+            elif key == "exception":
+                if (text := _logfmt_exception(value)) is None:
+                    continue
+                text = _logfmt_value(text)
+            elif key == "stacktrace" and isinstance(value, FrameType):
+                text = _logfmt_value("".join(traceback.format_stack(value)))
+            else:
+                text = _logfmt_value(value)
+            parts.append(f"{keys.get(key) or _logfmt_key(key)}={text}")
+
+        return " ".join(parts) + "\n"
+
+
+_LOGFMT_LEADING_KEYS = frozenset({"timestamp", "level", "msg"})
+_LOGFMT_SAFE_CHARS = frozenset(string.ascii_letters + string.digits + "-_.,:;/@+%#&()[]<>*!?~^|$")
+# Matches any character that isn't in the table of safe characters.
+_LOGFMT_UNSAFE = re.compile(f"[^{re.escape(''.join(sorted(_LOGFMT_SAFE_CHARS)))}]")
+_LOGFMT_KEYS: dict[str, str] = {}
+
+
+def _logfmt_key(key: str) -> str:
+    safe_key = _LOGFMT_UNSAFE.sub("_", key) or "_"
+    if len(_LOGFMT_KEYS) < 1024:
+        _LOGFMT_KEYS[key] = safe_key
+    return safe_key
+
+
+def _logfmt_value(value: object) -> str:
+    match value:
+        case None:
+            return ""
+        case str():
+            text = value
+        case bool():
+            return "true" if value else "false"
+        case int() | float():
+            return repr(value)
+        case datetime.datetime():
+            return value.isoformat()
+        case _:
+            text = str(value)
+
+    if text and _LOGFMT_UNSAFE.search(text) is None:
+        return text
+
+    # The C implementation of the JSON string encoder quotes the string and escapes quotes, backslashes, and control
+    # characters, which is exactly what logfmt needs.
+    return encode_basestring(text)
+
+
+def _logfmt_exception(exc: Any) -> str | None:
+    if not exc or exc[1] is None:
+        return None
+    exc_type, exc_value, _ = exc
+    return f"{exc_type.__name__}: {exc_value}"
+
+
+class _IsoformatBySecond:
+    """Formats datetimes in ISO 8601 format, reusing everything but the microseconds for datetimes within the same
+    second."""
+
+    def __init__(self):
+        super().__init__()
+        self._last: tuple[tuple[Any, ...] | None, str, str] = (None, "", "")
+
+    def __call__(self, timestamp: datetime.datetime) -> str:
+        t = timestamp
+        second = (t.second, t.minute, t.hour, t.day, t.month, t.year, t.tzinfo)
+        last_second, prefix, suffix = self._last
+        if second != last_second:
+            # YYYY-MM-DDTHH:MM:SS followed by the UTC offset, if any.
+            iso = t.replace(microsecond=0).isoformat()
+            prefix, suffix = iso[:19], iso[19:]
+            self._last = (second, prefix, suffix)
+        return f"{prefix}.{t.microsecond:06d}{suffix}"
+
+
+_CALLSITE_KEYS = frozenset({"call_filename", "call_module", "call_fn", "call_lineno"})
+
+
+class CompactJSONFormatter:
+    """Formats records as JSON lines, referring to callsites and messages by their interned IDs.
+
+    The first time this formatter sees a callsite or message it writes a
+    dictionary entry line ahead of the record, for example
+    `{"$callsite":0,"filename":...}` or `{"$msg":0,"text":...}`. After that,
+    records only carry "call_id" and "msg_id". Callsites are looked up in the
+    registry by the record's call info. Callsites that aren't registered and
+    messages that couldn't be interned are written inline.
+    """
+
+    def __init__(self, *, callsites: CallsiteRegistry = CALLSITES, messages: MessageRegistry = MESSAGES):
+        super().__init__()
+        self.callsites = callsites
+        self.messages = messages
+        self._seen_callsites: set[int] = set()
+        self._seen_messages: set[int] = set()
+
+    def __call__(self, record: Record) -> str:
+        lines: list[str] = []
+        out: Record = {}
+
+        callsite = self.callsites.lookup(
+            record.get("call_filename", ""), record.get("call_fn", ""), record.get("call_lineno", 0)
+        )
+        if callsite is not None:
+            if callsite.id not in self._seen_callsites:
+                lines.append(
+                    _compact_json(
+                        {
+                            "$callsite": callsite.id,
+                            "filename": callsite.filename,
+                            "module": callsite.module,
+                            "fn": callsite.fn,
+                            "lineno": callsite.lineno,
+                        }
+                    )
+                )
+                self._seen_callsites.add(callsite.id)
+            out["call_id"] = callsite.id
+
+        msg = record.get("msg")
+        msg_id = self.messages.register(msg)
+        if msg_id is None:
+            out["msg"] = msg
+        else:
+            if msg_id not in self._seen_messages:
+                lines.append(_compact_json({"$msg": msg_id, "text": msg}))
+                self._seen_messages.add(msg_id)
+            out["msg_id"] = msg_id
+
+        for key, value in record.items():
+            if key == "msg" or (callsite is not None and key in _CALLSITE_KEYS):
+                continue
+            out[key] = value
+
+        lines.append(_compact_json(out))
+        lines.append("")
+        return "\n".join(lines)
+
+
+def _compact_json(value: object) -> str:
+    return json.dumps(value, separators=(",", ":"), default=_json_default)
+
+
+def _json_default(value: object) -> str:
+    if isinstance(value, datetime.datetime | datetime.date | datetime.time):
+        return value.isoformat()
+    return repr(value)
+
+
 @dataclass(slots=True, kw_only=True)
 class CaptureDestination(Destination):
-    """A simple destination that records all records."""
-
-    limit: InitVar[int | None] = None
-    records: deque[Record] = field(init=False)
+    """A simple destination that records all records.
+
+    Captured records can be bounded by count (`limit`), by approximate size in
+    bytes (`max_bytes`, estimated with sys.getsizeof()), or both. Once full,
+    the oldest records are discarded.
+
+    Records are indexed by level and call_module as they're captured so that
+    find() and count_by() don't have to scan every captured record for those
+    fields. Their values are snapshotted at capture time, so they stay right
+    even if a later destination pops them from the record. Records are also
+    indexed by which keys they have, but only once find() or count_by() is
+    first used with some other key, so captures that are never queried don't
+    pay for it.
+    """
+
+    limit: int | None = None
+    max_bytes: int | None = None
+    records: deque[Record] = field(init=False, default_factory=deque)
     discarded_records: int = field(init=False, default=0)
-
-    def __post_init__(self, limit: int | None) -> None:
-        self.records: deque[Record] = deque(maxlen=limit)
+    _sizes: deque[int] = field(init=False, default_factory=deque)
+    _bytes: int = field(init=False, default=0)
+    _captured: deque[_Captured] = field(init=False, default_factory=deque)
+    _by_level: dict[Any, deque[_Captured]] = field(init=False, default_factory=dict)
+    _by_module: dict[Any, deque[_Captured]] = field(init=False, default_factory=dict)
+    _by_key: dict[str, deque[_Captured]] | None = field(init=False, default=None)
 
     @override
     def __call__(self, record: Record) -> None:
         """Capture the record. If the limit is reached, discard the oldest record."""
-        current_len = len(self.records)
-        self.records.append(record)
-
-        # If the length didn't change, we discarded a record
-        if len(self.records) == current_len:
+        if self.limit is not None and self.limit <= 0:
             self.discarded_records += 1
+            return
+
+        size = 0
+        if self.max_bytes is not None:
+            size = approximate_size(record)
+            while self.records and self._bytes + size > self.max_bytes:
+                self._discard_oldest()
+
+        if self.limit is not None and len(self.records) >= self.limit:
+            self._discard_oldest()
+
+        self.records.append(record)
+        self._sizes.append(size)
+        self._bytes += size
+
+        captured = _Captured(record, record.get("level"), record.get("call_module"))
+        self._captured.append(captured)
+        _add_to_index(self._by_level, captured.level, captured)
+        _add_to_index(self._by_module, captured.module, captured)
+        if self._by_key is not None:
+            self._add_to_key_index(self._by_key, captured)
+
+    def _discard_oldest(self) -> None:
+        _ = self.records.popleft()
+        self._bytes -= self._sizes.popleft()
+
+        # Indexes are in capture order, so the oldest record is always first.
+        captured = self._captured.popleft()
+        _remove_oldest_from_index(self._by_level, captured.level)
+        _remove_oldest_from_index(self._by_module, captured.module)
+        if self._by_key is not None:
+            for key in captured.keys:
+                _remove_oldest_from_index(self._by_key, key)
+
+        self.discarded_records += 1
+
+    def _key_index(self) -> dict[str, deque[_Captured]]:
+        if self._by_key is None:
+            self._by_key = {}
+            for captured in self._captured:
+                self._add_to_key_index(self._by_key, captured)
+        return self._by_key
+
+    def _add_to_key_index(self, index: dict[str, deque[_Captured]], captured: _Captured) -> None:
+        # The keys are remembered so that the record can be removed from the same entries when it's discarded.
+        captured.keys = tuple(captured.record)
+        for key in captured.keys:
+            _add_to_index(index, key, captured)
+
+    def find(self, **fields: Any) -> list[Record]:
+        """Find all captured records that have the given fields, for example find(level="error", user_id=42).
+
+        Candidates are taken from the smallest matching index, so only a
+        fraction of the captured records need to be checked.
+        """
+        candidates: Iterable[_Captured] = self._captured
+        smallest = len(self._captured)
+
+        for key, value in fields.items():
+            match key:
+                case "level":
+                    index = self._by_level.get(value, ())
+                case "call_module":
+                    index = self._by_module.get(value, ())
+                case _:
+                    index = self._key_index().get(key, ())
+
+            if len(index) < smallest:
+                candidates = index
+                smallest = len(index)
+
+        return [captured.record for captured in candidates if captured.matches(fields)]
+
+    def count_by(self, key: str) -> dict[Any, int]:
+        """Count the captured records by the value of the given key. Records without the key aren't counted."""
+        match key:
+            case "level":
+                return {value: len(records) for value, records in self._by_level.items() if value is not None}
+            case "call_module":
+                return {value: len(records) for value, records in self._by_module.items() if value is not None}
+            case _:
+                captured = self._key_index().get(key, ())
+                return dict(Counter(c.record[key] for c in captured if key in c.record))
 
     def reset(self):
         """Clear all captured records"""
         self.records.clear()
+        self._sizes.clear()
+        self._bytes = 0
+        self._captured.clear()
+        self._by_level.clear()
+        self._by_module.clear()
+        self._by_key = None
         self.discarded_records = 0
 
     def playback(self, *destinations: Destination):
@@ -111,6 +569,138 @@ class CaptureDestination(Destination):
         self.reset()
 
 
+@dataclass(slots=True)
+class _Captured:
+    """A captured record along with the values of its indexed fields when it was captured."""
+
+    record: Record
+    level: Any
+    module: Any
+    keys: tuple[str, ...] = ()
+
+    def matches(self, fields: dict[str, Any]) -> bool:
+        for key, value in fields.items():
+            match key:
+                case "level":
+                    if self.level != value:
+                        return False
+                case "call_module":
+                    if self.module != value:
+                        return False
+                case _:
+                    if key not in self.record or self.record[key] != value:
+                        return False
+        return True
+
+
+def _add_to_index(index: dict[Any, deque[_Captured]], value: Any, captured: _Captured) -> None:
+    entries = index.get(value)
+    if entries is None:
+        entries = index[value] = deque()
+    entries.append(captured)
+
+
+def _remove_oldest_from_index(index: dict[Any, deque[_Captured]], value: Any) -> None:
+    entries = index[value]
+    _ = entries.popleft()
+    if not entries:
+        del index[value]
+
+
+@dataclass(slots=True, kw_only=True)
+class FlightRecorderDestination(Destination):
+    """A destination that keeps the most recent records and only outputs them when something goes wrong.
+
+    Records of every level are kept, unformatted, in a preallocated ring of
+    `capacity` records (and optionally at most `max_bytes`, estimated with
+    sys.getsizeof()). When a record with one of the `trigger_levels` arrives
+    the ring is dumped, oldest first, to `destination` and then cleared. The
+    error logged by loglady's excepthook for an unhandled exception triggers a
+    dump as well.
+
+    This makes it possible to keep other destinations at a higher level while
+    still getting full debug context around failures.
+    """
+
+    destination: Destination
+    capacity: int = 1000
+    max_bytes: int | None = None
+    trigger_levels: frozenset[str] = frozenset({"error"})
+    dumps: int = field(init=False, default=0)
+    _ring: list[Record | None] = field(init=False)
+    _sizes: list[int] = field(init=False)
+    _start: int = field(init=False, default=0)
+    _len: int = field(init=False, default=0)
+    _bytes: int = field(init=False, default=0)
+
+    def __post_init__(self) -> None:
+        if self.capacity < 1:
+            msg = f"capacity must be at least 1, got {self.capacity}"
+            raise ValueError(msg)
+
+        self._ring = [None] * self.capacity
+        self._sizes = [0] * self.capacity
+
+    @override
+    def __call__(self, record: Record) -> None:
+        size = 0
+        if self.max_bytes is not None:
+            size = approximate_size(record)
+            while self._len and self._bytes + size > self.max_bytes:
+                self._evict_oldest()
+
+        if self._len == self.capacity:
+            self._evict_oldest()
+
+        # Other destinations are allowed to modify records, so keep a copy.
+        n = (self._start + self._len) % self.capacity
+        self._ring[n] = record.copy()
+        self._sizes[n] = size
+        self._len += 1
+        self._bytes += size
+
+        if record.get("level") in self.trigger_levels:
+            self.dump()
+
+    def dump(self) -> None:
+        """Output all recorded records to the destination and clear the ring."""
+        records = list(self)
+        self.reset()
+        for record in records:
+            self.destination(record)
+        self.dumps += 1
+
+    def reset(self) -> None:
+        """Clear all recorded records"""
+        for n in range(self.capacity):
+            self._ring[n] = None
+        self._start = self._len = self._bytes = 0
+
+    @override
+    def flush(self):
+        self.destination.flush()
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self) -> Iterator[Record]:
+        for n in range(self._len):
+            record = self._ring[(self._start + n) % self.capacity]
+            assert record is not None
+            yield record
+
+    def _evict_oldest(self) -> None:
+        self._ring[self._start] = None
+        self._bytes -= self._sizes[self._start]
+        self._start = (self._start + 1) % self.capacity
+        self._len -= 1
+
+
+def approximate_size(record: Record) -> int:
+    """Estimate how much memory a record takes up, from sys.getsizeof() of it and its values."""
+    return sys.getsizeof(record) + sum(sys.getsizeof(value) for value in record.values())
+
+
 @dataclass()
 class LazyDestination(Destination):
     """A destination that wraps another destination, only creating it when
@@ -125,3 +715,7 @@ class LazyDestination(Destination):
     @override
     def __call__(self, record: Record) -> None:
         self.instance(record)
+
+    @override
+    def batch(self, records: Sequence[Record]) -> None:
+        self.instance.batch(records)
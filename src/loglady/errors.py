@@ -22,3 +22,10 @@ class NotConfiguredError(RuntimeError):
 
     def __init__(self) -> None:
         super().__init__("log() called before loglady.configure() and no fallback available.")
+
+
+class InvalidTemplateError(LogladyError):
+    """Raised when a TemplateFormatter's template can't be compiled."""
+
+    def __init__(self, *, template: str, reason: str) -> None:
+        super().__init__(f"invalid template {template!r}: {reason}")
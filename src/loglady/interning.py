@@ -0,0 +1,130 @@
+# Copyright (c) 2025 Alethea Katherine Flowers.
+# Published under the standard MIT License.
+# Full text available at: https://opensource.org/licenses/MIT
+
+"""Interning registries for callsites and message templates.
+
+Most records repeat the same callsite (filename, module, function, line) and a lot of them repeat the same message with
+different fields. These registries assign each distinct callsite or message a small integer ID the first time it's
+seen, so encoders can write a dictionary entry once and then only refer to the ID.
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+from collections.abc import Iterator
+from dataclasses import dataclass
+from types import CodeType, FrameType
+
+
+@dataclass(frozen=True, slots=True)
+class Callsite:
+    """A single place in the code that emits log records."""
+
+    id: int
+    filename: str
+    module: str
+    fn: str
+    lineno: int
+
+
+class CallsiteRegistry:
+    """Assigns each callsite a stable integer ID.
+
+    Callsites are keyed by their code object and line number, so looking up a callsite that's been seen before is a
+    single dict lookup and doesn't touch any of the frame's strings. Records only carry the callsite's location, so
+    they're also indexed by that for lookup().
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._callsites: list[Callsite] = []
+        self._index: dict[tuple[CodeType, int], Callsite] = {}
+        self._by_location: dict[tuple[str, str, int], Callsite] = {}
+        self._lock = threading.Lock()
+
+    def register(self, frame: FrameType) -> Callsite:
+        """Get the Callsite for the given frame, registering it if this is the first time it's been seen."""
+        key = (frame.f_code, frame.f_lineno)
+
+        if (callsite := self._index.get(key)) is not None:
+            return callsite
+
+        with self._lock:
+            # Another thread may have registered it while we were waiting on the lock.
+            if (callsite := self._index.get(key)) is not None:
+                return callsite
+
+            code = frame.f_code
+            callsite = Callsite(
+                id=len(self._callsites),
+                filename=sys.intern(code.co_filename),
+                module=sys.intern(frame.f_globals.get("__name__") or "?"),
+                fn=sys.intern(code.co_qualname),
+                lineno=frame.f_lineno,
+            )
+            self._callsites.append(callsite)
+            self._index[key] = callsite
+            self._by_location[callsite.filename, callsite.fn, callsite.lineno] = callsite
+
+        return callsite
+
+    def lookup(self, filename: str, fn: str, lineno: int) -> Callsite | None:
+        """Get the registered Callsite at the given location, as found in a record's call info, if there is one."""
+        return self._by_location.get((filename, fn, lineno))
+
+    def __getitem__(self, id: int) -> Callsite:
+        return self._callsites[id]
+
+    def __len__(self) -> int:
+        return len(self._callsites)
+
+    def __iter__(self) -> Iterator[Callsite]:
+        return iter(self._callsites)
+
+
+class MessageRegistry:
+    """Assigns each distinct message string a stable integer ID.
+
+    Messages are often built with f-strings, so there's no guarantee that the set of distinct messages is small. Once
+    `limit` messages have been registered, new messages aren't assigned an ID and encoders should write them inline.
+    """
+
+    def __init__(self, *, limit: int = 4096) -> None:
+        super().__init__()
+        self.limit = limit
+        self._messages: list[str] = []
+        self._index: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def register(self, msg: object) -> int | None:
+        """Get the ID for the given message, or None if it can't be (or is no longer being) interned."""
+        if type(msg) is not str:
+            return None
+
+        if (id := self._index.get(msg)) is not None:
+            return id
+
+        with self._lock:
+            if (id := self._index.get(msg)) is not None:
+                return id
+
+            if len(self._messages) >= self.limit:
+                return None
+
+            id = len(self._messages)
+            self._messages.append(msg)
+            self._index[msg] = id
+
+        return id
+
+    def __getitem__(self, id: int) -> str:
+        return self._messages[id]
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+
+CALLSITES = CallsiteRegistry()
+MESSAGES = MessageRegistry()
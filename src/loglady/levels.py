@@ -0,0 +1,103 @@
+# Copyright (c) 2025 Alethea Katherine Flowers.
+# Published under the standard MIT License.
+# Full text available at: https://opensource.org/licenses/MIT
+
+"""Log levels and their relative severity."""
+
+from __future__ import annotations
+
+import threading
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import Protocol, override
+
+LEVELS = MappingProxyType(
+    dict(
+        notset=0,
+        debug=10,
+        info=20,
+        success=25,
+        warning=30,
+        error=40,
+    )
+)
+
+
+def severity(level: str | None) -> int:
+    """Get the numeric severity of the given level. Missing and unknown levels are treated as notset."""
+    return LEVELS.get(level or "notset", 0)
+
+
+class Thresholds(Protocol):
+    """Something that knows the minimum severity of records for a named logger."""
+
+    def threshold(self, name: str) -> int: ...
+
+
+class LevelTree(Thresholds):
+    """Minimum levels for named loggers, arranged by dotted name.
+
+    A logger's effective level is the level configured for its name or, if
+    there isn't one, for its closest parent. For example, with:
+
+        LevelTree({"db": "warning", "db.pool": "debug"})
+
+    "db.pool" and "db.pool.conn" log debug and above while "db" and
+    "db.migrations" only log warning and above. The empty name, "", sets the
+    level for every logger without a closer match.
+
+    Effective levels are cached as they're looked up, and the cache is thrown
+    away whenever the configured levels change.
+    """
+
+    def __init__(self, levels: Mapping[str, str] | None = None):
+        super().__init__()
+        self._levels: dict[str, int] = {}
+        self._cache: dict[str, int] = {}
+        self._lock = threading.Lock()
+        if levels:
+            self.update(levels)
+
+    @property
+    def levels(self) -> Mapping[str, str]:
+        """The configured levels, by name."""
+        names = {value: name for name, value in LEVELS.items()}
+        return MappingProxyType({name: names[value] for name, value in self._levels.items()})
+
+    def set(self, name: str, level: str | None) -> None:
+        """Set the level for the given name and its children. A level of None removes the name's level."""
+        self.update({name: level})
+
+    def update(self, levels: Mapping[str, str | None]) -> None:
+        """Set the levels for several names at once."""
+        for level in levels.values():
+            if level is not None and level not in LEVELS:
+                msg = f"unknown level {level!r}, expected one of {', '.join(LEVELS)}"
+                raise ValueError(msg)
+
+        with self._lock:
+            for name, level in levels.items():
+                if level is None:
+                    self._levels.pop(name, None)
+                else:
+                    self._levels[name] = LEVELS[level]
+            # Replace the cache rather than clearing it, so that a lookup that raced with this update can only ever
+            # store its stale result in the old cache.
+            self._cache = {}
+
+    @override
+    def threshold(self, name: str) -> int:
+        """The minimum severity of records logged by the logger with the given name."""
+        cache = self._cache
+        if (threshold := cache.get(name)) is None:
+            threshold = cache[name] = self._resolve(name)
+        return threshold
+
+    def _resolve(self, name: str) -> int:
+        levels = self._levels
+        while True:
+            if (threshold := levels.get(name)) is not None:
+                return threshold
+            if not name:
+                return 0
+            name = name.rpartition(".")[0]
@@ -8,6 +8,7 @@ from dataclasses import dataclass, field
 from types import MappingProxyType
 from typing import Any, Self, override
 
+from .levels import Thresholds, severity
 from .types import Context, Relay
 
 
@@ -17,10 +18,19 @@ class Logger:
 
     NOTE: Loggers shouldn't be created directly, instead, use `loglady.configure()` and `loglady.logger()` to get an
     instance.
+
+    A logger with a "name" in its context is a named logger, for example `loglady.logger(name="db.pool")`. Records
+    from named loggers that are less severe than the level configured for that name (see `LevelTree`) are dropped
+    before they're even created.
     """
 
     _relay: Relay
     _context: Context = field(default_factory=dict)
+    _thresholds: Thresholds | None = None
+    _name: str | None = field(init=False, default=None)
+
+    def __post_init__(self):
+        self._name = self._context.get("name")
 
     @property
     def context(self) -> Mapping[str, Any]:
@@ -31,18 +41,19 @@ class Logger:
     def bind(self, **context: Any) -> Self:
         """Create a new logger with the given context. The new logger inherits
         this logger's context."""
-        if context is self.context or self.context == context == {}:
+        if not context and not self._context:
             return self
 
         ctx = self._context.copy()
         ctx.update(**context)
-        return self.__class__(_relay=self._relay, _context=ctx)
+        return self.__class__(_relay=self._relay, _context=ctx, _thresholds=self._thresholds)
 
     def unbind(self, *keys: str) -> Self:
         """Create a new logger without the given keys in the context."""
         inst = self.bind()
         for key in keys:
             inst._context.pop(key, None)
+        inst._name = inst._context.get("name")
         return inst
 
     def prefix(self, prefix: str, **context) -> Self:
@@ -54,8 +65,19 @@ class Logger:
         """You probably don't wanna call this, as it's the common log method
         used by info(), warning(), etc. I mean, you can call it, I'm a
         docstring, not a cop."""
-        rec = self._context.copy()
-        rec.update(**record)
+        if (
+            self._name is not None
+            and self._thresholds is not None
+            and severity(record.get("level")) < self._thresholds.threshold(self._name)
+        ):
+            return
+
+        # record is a fresh dict built from the keyword arguments, so without any context it can be used as-is.
+        if self._context:
+            rec = self._context.copy()
+            rec.update(record)
+        else:
+            rec = record
         rec["msg"] = msg
 
         self._relay(rec)
@@ -29,48 +29,22 @@ def logger(**context: Any) -> Logger:
 
 bind = logger
 
-
-def log(msg, **record: Any) -> None:
-    logger().log(msg, **record)
-
-
-def trace(msg, **record: Any) -> None:
-    return logger().trace(msg, **record)
-
-
-def debug(msg, **record: Any) -> None:
-    logger().debug(msg, **record)
-
-
-def warning(msg, **record: Any) -> None:
-    return logger().warning(msg, **record)
-
-
+# The magics below are the methods of a single, shared logger that follows the manager stack. This makes calling
+# loglady.info() exactly as cheap as calling info() on a logger you're holding onto, rather than creating a new Logger
+# on every call.
+_logger = manager_stack.logger()
+
+log = _logger.log
+trace = _logger.trace
+debug = _logger.debug
+warning = _logger.warning
 warn = warning
-
-
-def info(msg, **record: Any) -> None:
-    logger().info(msg, **record)
-
-
-def success(msg, **record: Any) -> None:
-    logger().success(msg, **record)
-
-
-def error(msg, **record: Any) -> None:
-    logger().error(msg, **record)
-
-
-def exception(msg, **record: Any) -> None:
-    logger().exception(msg, **record)
-
-
-def prefix(prefix: str, **context: Any) -> Logger:
-    return logger().prefix(prefix, **context)
-
-
-def catch(exc_types=BaseException, *, msg: str = "unexpected error", reraise: bool = False):
-    return logger().catch(exc_types=exc_types, msg=msg, reraise=reraise)
+info = _logger.info
+success = _logger.success
+error = _logger.error
+exception = _logger.exception
+prefix = _logger.prefix
+catch = _logger.catch
 
 
 def flush():
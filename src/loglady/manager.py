@@ -2,9 +2,13 @@
 # Published under the standard MIT License.
 # Full text available at: https://opensource.org/licenses/MIT
 
+import threading
 from dataclasses import dataclass, field
 
+from .destination import Destination, DestinationList
+from .levels import LevelTree
 from .logger import Logger
+from .switches import CallsiteSwitches
 from .transport import Transport
 from .types import ProcessorList, Record
 
@@ -25,21 +29,61 @@ class Manager:
     Managers are responsible for the lifetime of its Transport and Destinations.
     If you're manually creating managers, don't forget to call start() and
     stop().
+
+    `levels` holds the minimum levels for named loggers created through this
+    manager. It can be changed at any time, and loggers that have already been
+    created will pick up the change. Processors are changed with reconfigure().
+
+    If `switches` is given, records from callsites that it has switched off are
+    dropped before they're run through any processors.
     """
 
     transport: Transport
     processors: ProcessorList
+    levels: LevelTree = field(default_factory=LevelTree)
+    switches: CallsiteSwitches | None = None
     _logger_prototype: Logger = field(init=False)
+    _reconfigure_lock: threading.Lock = field(init=False, default_factory=threading.Lock)
 
     def __post_init__(
         self,
     ):
-        self._logger_prototype = Logger(_relay=self.relay)
+        self._logger_prototype = Logger(_relay=self.relay, _thresholds=self.levels)
 
     def logger(self, **context):
         """Get a new Logger"""
         return self._logger_prototype.bind(**context)
 
+    def reconfigure(
+        self,
+        *,
+        processors: ProcessorList | None = None,
+        destinations: Destination | DestinationList | None = None,
+    ):
+        """Swap in new processors and/or destinations while the manager is running.
+
+        The transport (and its background thread and queue, if it has them) is
+        kept. Records relayed before this is called go through the old
+        processors to the old destinations, and records relayed after it
+        returns go through the new processors to the new destinations. No
+        record is dropped or delivered twice.
+
+        Destinations are swapped before processors, so a record that's relayed
+        while this runs never goes through the new processors to the old
+        destinations, though it can go through the old processors to the new
+        destinations.
+        """
+        with self._reconfigure_lock:
+            if destinations is not None:
+                if (replace := getattr(self.transport, "replace_destinations", None)) is not None:
+                    replace(destinations)
+                else:
+                    Transport.replace_destinations(self.transport, destinations)
+
+            if processors is not None:
+                # relay() reads the processors once per record, so replacing them as a whole is enough.
+                self.processors = processors
+
     def flush(self):
         """Ask all destinations to write any pending logs"""
         self.transport.flush()
@@ -54,6 +98,9 @@ class Manager:
 
     def relay(self, record: Record) -> None:
         """Run a record through processors and hand it off to the transport"""
+        if (switches := self.switches) is not None and not switches.allows(record):
+            return
+
         processed_record = self._apply_processors(record)
         if processed_record is None:
             return
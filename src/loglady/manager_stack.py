@@ -5,6 +5,7 @@
 
 import atexit
 import contextlib
+from contextvars import ContextVar
 from dataclasses import InitVar, dataclass, field
 
 from ._environ import FALLBACK_MODE
@@ -16,43 +17,79 @@ from .types import Record
 
 @dataclass(slots=True, kw_only=True)
 class ManagerStack:
+    """The stack of managers that loggers from loglady.logger() and the magics relay records to.
+
+    By default there's a single stack for the whole process. Within isolated(),
+    the current thread or async task gets its own stack on top of it: push(),
+    pop(), and rewind() only affect that context, and the managers it pushes
+    take precedence over the process-wide ones in that context only.
+    """
+
     fallback_mode: InitVar[FallbackMode | None] = None
 
     _stack: list[Manager] = field(default_factory=list)
     _fallback: Fallback = field(init=False)
+    # The top of the stack (or the fallback manager) is kept up to date by push(), pop(), and clear() so relaying a
+    # record doesn't need to look at the stack at all.
+    _current: Manager = field(init=False)
+    # A logger with no context that relays to whichever manager is current, shared by every caller of logger() that
+    # doesn't pass any context.
+    _logger: Logger = field(init=False)
+    # The context-local stack, or None outside of isolated(). It's a tuple so that async tasks, which start with a
+    # copy of their parent's context, can't change their parent's stack.
+    _local: ContextVar[tuple[Manager, ...] | None] = field(init=False)
 
     def __post_init__(self, fallback_mode: FallbackMode | None):
         self._fallback = Fallback(mode=validate_fallback_mode(fallback_mode or FALLBACK_MODE))
+        self._current = self._stack[-1] if self._stack else self._fallback.manager
+        self._logger = Logger(_relay=self.relay, _thresholds=self)
+        self._local = ContextVar(f"loglady_manager_stack_{id(self)}", default=None)
 
     @property
     def current(self) -> Manager:
-        if not self._stack:
-            return self._fallback.manager
-        return self._stack[-1]
+        if local := self._local.get():
+            return local[-1]
+        return self._current
 
     @property
     def has_valid_manager(self) -> bool:
-        return bool(self._stack)
+        return bool(self._local.get() or self._stack)
 
     def push(self, manager: Manager) -> None:
+        if (local := self._local.get()) is not None:
+            self._local.set((*local, manager))
+            return
+
         # When the first real manager is pushed onto the stack, send all collected fallback logs to it.
         if not self.has_valid_manager:
             self._fallback.drain_to_new_manager(manager)
 
         self._stack.append(manager)
+        self._current = manager
 
     def pop(self) -> Manager | None:
+        if (local := self._local.get()) is not None:
+            if not local:
+                return None
+            self._local.set(local[:-1])
+            return local[-1]
+
         if len(self._stack) == 1:
             return None
-        return self._stack.pop()
+        manager = self._stack.pop()
+        self._current = self._stack[-1] if self._stack else self._fallback.manager
+        return manager
 
     def clear(self) -> None:
         self._stack.clear()
+        self._current = self._fallback.manager
 
     def flush_all(self) -> None:
         self._fallback.flush()
         for manager in self._stack:
             manager.flush()
+        for manager in self._local.get() or ():
+            manager.flush()
 
     def stop_all(self) -> None:
         for manager in self._stack:
@@ -61,17 +98,37 @@ class ManagerStack:
         self._fallback.drain_remaining_to_warn()
 
     def logger(self, **context) -> Logger:
-        return Logger(_relay=self.relay, _context=context)
+        return self._logger.bind(**context)
 
     def relay(self, record: Record) -> None:
-        self.current.relay(record)
+        local = self._local.get()
+        (local[-1] if local else self._current).relay(record)
+
+    def threshold(self, name: str) -> int:
+        """Named loggers from the stack use the levels of whichever manager is current."""
+        return self.current.levels.threshold(name)
 
     @contextlib.contextmanager
     def rewind(self):
         """A context manager that automatically rewinds the stack on exit.
 
         This is useful for applying temporary configuration in tests and such.
+        Within isolated(), only the context-local stack is rewound: it's put
+        back exactly as it was, even if managers from below the checkpoint
+        were popped in the meantime.
         """
+        if (local := self._local.get()) is not None:
+            try:
+                yield
+            finally:
+                pushed = self._local.get() or ()
+                self._local.set(local)
+                kept = {id(manager) for manager in local}
+                for manager in reversed(pushed):
+                    if id(manager) not in kept:
+                        manager.flush()
+            return
+
         checkpoint_size = len(self._stack)
         try:
             yield
@@ -81,6 +138,25 @@ class ManagerStack:
                 if (manager := self.pop()) is not None:
                     manager.flush()
 
+    @contextlib.contextmanager
+    def isolated(self):
+        """A context manager that gives the current thread or async task its own stack until it exits.
+
+        Managers pushed within it are only used by loggers in this context
+        (including async tasks started from it, but not new threads), so
+        several threads can each configure their own manager without seeing
+        each other's. Any managers still on the context's stack when it exits
+        are flushed and discarded.
+        """
+        token = self._local.set(())
+        try:
+            yield
+        finally:
+            pushed = self._local.get() or ()
+            self._local.reset(token)
+            for manager in reversed(pushed):
+                manager.flush()
+
 
 _DEFAULT_STACK = ManagerStack()
 
@@ -121,6 +197,12 @@ def rewind():
         yield
 
 
+@contextlib.contextmanager
+def isolated():
+    with _DEFAULT_STACK.isolated():
+        yield
+
+
 @atexit.register
 def _on_shutdown():  # pyright: ignore[reportUnusedFunction]
     _DEFAULT_STACK.flush_all()
@@ -8,6 +8,7 @@ import threading
 from types import FrameType
 
 from ._tracebackhide import check_for_tracebackhide
+from .interning import CALLSITES, Callsite, CallsiteRegistry
 from .types import Record
 
 
@@ -44,18 +45,75 @@ def add_exception_and_stack_info(record: Record) -> Record:
 
 
 def add_call_info(record: Record) -> Record:
-    """Add the calling function's name, filename, module, and lineno"""
+    """Add the calling function's name, filename, module, and lineno
+
+    The callsite is also registered with `interning.CALLSITES`, which lets
+    encoders look it up by its location and refer to it by ID. The ID itself
+    isn't added, since it means nothing outside of this process.
+    """
     if "call_filename" in record:
         return record
 
-    frame = _find_app_frame()
-    record["call_filename"] = frame.f_code.co_filename
-    record["call_module"] = frame.f_globals["__name__"]
-    record["call_fn"] = frame.f_code.co_qualname
-    record["call_lineno"] = frame.f_lineno
+    callsite = find_callsite()
+    record["call_filename"] = callsite.filename
+    record["call_module"] = callsite.module
+    record["call_fn"] = callsite.fn
+    record["call_lineno"] = callsite.lineno
+    return record
+
+
+def find_callsite(callsites: CallsiteRegistry = CALLSITES) -> Callsite:
+    """Get the callsite of the code that's logging, skipping over loglady's own frames, and register it"""
+    return callsites.register(_find_app_frame())
+
+
+def add_lazy_call_info(record: Record) -> Record:
+    """A cheaper add_call_info() for records that may never be looked at
+
+    This only stores the calling code object, line number, and module name as
+    "call_site", and skips reading the locals of every frame on the way up
+    unless the frame's code mentions __tracebackhide__. resolve_call_info()
+    turns "call_site" into the fields added by add_call_info().
+    """
+    if "call_filename" in record or "call_site" in record:
+        return record
+
+    f = sys._getframe(1)  # pyright: ignore[reportPrivateUsage]
+    while True:
+        name = f.f_globals.get("__name__") or "?"
+        if not name.startswith("loglady.") and not (_may_hide_traceback(f) and check_for_tracebackhide(f)):
+            break
+        if f.f_back is None:
+            name = "?"
+            break
+        f = f.f_back
+
+    record["call_site"] = (f.f_code, f.f_lineno, name)
+    return record
+
+
+def resolve_call_info(record: Record) -> Record:
+    """Turns the "call_site" added by add_lazy_call_info() into call info fields"""
+    if (call_site := record.pop("call_site", None)) is None:
+        return record
+
+    code, lineno, module = call_site
+    record["call_filename"] = code.co_filename
+    record["call_module"] = module
+    record["call_fn"] = code.co_qualname
+    record["call_lineno"] = lineno
     return record
 
 
+def _may_hide_traceback(frame: FrameType) -> bool:
+    code = frame.f_code
+    return (
+        "__tracebackhide__" in code.co_varnames
+        or "__tracebackhide__" in code.co_names
+        or "__tracebackhide__" in frame.f_globals
+    )
+
+
 def _find_app_frame(stack: FrameType | None = None, ignores=("loglady.")) -> FrameType:
     """Finds the first frame that isn't part of the logging code"""
     if stack is None:
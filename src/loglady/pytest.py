@@ -4,24 +4,52 @@
 
 from __future__ import annotations
 
+import concurrent.futures
 import contextlib
+import functools
+import multiprocessing
+import os
+import pickle
+import time
+import zlib
 from collections import UserString
-from collections.abc import Generator, Sequence
+from collections.abc import Generator, Iterator, Sequence
 from io import StringIO
-from typing import Literal, cast
+from typing import Any, cast, overload, override
+from warnings import warn
 
 import pytest
 import rich
 
 from . import config, manager_stack
-from .destination import CaptureDestination
-from .rich.destination import RichConsoleDestination
+from .destination import CaptureDestination, Destination
+from .manager import Manager
+from .processors import (
+    add_exception_and_stack_info,
+    add_lazy_call_info,
+    add_thread_info,
+    add_timestamp,
+    fancy_prefix_icon,
+    resolve_call_info,
+)
+from .rich.destination import RichConsoleDestination, make_default_formatters
+from .rich.offload import portable_record
 from .transport import SyncTransport
-from .types import Record
+from .types import ProcessorList, Record
+from .warnings import CaptureRenderWarning
+
+# Used by --loglady-lean-capture: records only get the fields that can't be worked out later, and the rest are added
+# when a failed test's captured logs are rendered.
+LEAN_PROCESSORS = (add_timestamp, add_thread_info, add_exception_and_stack_info, add_lazy_call_info)
+LEAN_RENDER_PROCESSORS = (resolve_call_info, fancy_prefix_icon)
 
 
 @pytest.hookimpl(trylast=True)
 def pytest_configure(config: pytest.Config) -> None:
+    if config.option.loglady_lean_capture and config.option.loglady_context_local_capture:
+        msg = "--loglady-lean-capture can't be combined with --loglady-context-local-capture"
+        raise pytest.UsageError(msg)
+
     _ = config.pluginmanager.register(LogladyPlugin(config), "loglady-plugin")
 
 
@@ -39,6 +67,24 @@ def pytest_addoption(parser):
         default=1000,
         help="Set the limit for captured logs. Having some limit here prevents wasted memory or CPU, which can slow down tests. Set negative to disable the limit.",
     )
+    group.addoption(
+        "--loglady-context-local-capture",
+        action="store_true",
+        default=False,
+        help="Capture each test's logs with a manager that's local to the thread (or async task) running the test, so tests can run concurrently in threads. Logs from other threads the test starts aren't captured.",
+    )
+    group.addoption(
+        "--loglady-render-workers",
+        type=int,
+        default=None,
+        help=f"Number of processes used to format the captured logs of failed tests at the end of the session. Processes are only started when there are at least {PARALLEL_RENDER_MIN_RECORDS} records to format. Defaults to the number of CPUs, up to 8. Set to 0 or 1 to always format them in the main process.",
+    )
+    group.addoption(
+        "--loglady-lean-capture",
+        action="store_true",
+        default=False,
+        help="Capture logs with a single manager for the whole session that only records the fields that can't be worked out later, like the timestamp and the calling code, and work out the rest only when a failed test's logs are shown. This makes logging during tests much cheaper. Records captured by the loglady_capture fixture still get every field.",
+    )
 
 
 class LogladyPlugin:
@@ -56,8 +102,9 @@ class LogladyPlugin:
         self.config = config
         self._global_captured = None
         self._fixture_captured = None
-        self._manager = None
+        self._manager: Manager | None = None
         self._has_fixture = False
+        self._failed_nodeids: set[str] = set()
 
     @property
     def use_color(self) -> bool:
@@ -68,12 +115,30 @@ class LogladyPlugin:
         return self.config.option.loglady_disable_deferred_formatting
 
     @property
-    def capture_limit(self) -> int | Literal[False]:
+    def context_local_capture(self) -> bool:
+        return self.config.option.loglady_context_local_capture
+
+    @property
+    def render_workers(self) -> int:
+        workers = self.config.option.loglady_render_workers
+        return workers if workers is not None else min(os.cpu_count() or 1, 8)
+
+    @property
+    def lean_capture(self) -> bool:
+        return self.config.option.loglady_lean_capture
+
+    @property
+    def capture_limit(self) -> int | None:
         limit = self.config.option.loglady_capture_limit
-        return limit if limit >= 0 else False
+        return limit if limit >= 0 else None
 
     def start_global_capturing(self):
         self._global_captured = CaptureDestination(limit=self.capture_limit)
+
+        if self.lean_capture:
+            self._start_lean_capturing(self._global_captured)
+            return
+
         self._manager = config.configure(
             transport=SyncTransport(self._global_captured),
             processors=config.DEFAULT_PROCESSORS,
@@ -81,12 +146,32 @@ class LogladyPlugin:
             once=False,
         )
 
+    def _start_lean_capturing(self, captured: CaptureDestination):
+        # One manager is kept for the whole session and only its destination is swapped for each phase. It's pushed
+        # again if a test leaves its own manager on the stack.
+        if self._manager is None:
+            self._manager = Manager(transport=SyncTransport(), processors=LEAN_PROCESSORS)
+
+        self._manager.transport.destinations = captured
+        if not manager_stack.has_valid_manager() or manager_stack.current() is not self._manager:
+            manager_stack.push(self._manager)
+
     def stop_global_capturing(self):
         if self._manager is None:
             return
 
         self._manager.flush()
-        _ = manager_stack.pop()
+        if not self.lean_capture:
+            _ = manager_stack.pop()
+
+    def stop_lean_capturing(self):
+        if self._manager is None or not self.lean_capture:
+            return
+
+        self._manager.flush()
+        if manager_stack.has_valid_manager() and manager_stack.current() is self._manager:
+            _ = manager_stack.pop()
+        self._manager = None
 
     def enable_fixture(self):
         self._fixture_captured = CaptureDestination(limit=self.capture_limit)
@@ -101,17 +186,24 @@ class LogladyPlugin:
 
         assert self._manager is not None
         self._manager.transport.destinations = self._fixture_captured
+        if self.lean_capture:
+            # Tests look at the fixture's records, so they get every field.
+            self._manager.reconfigure(processors=config.DEFAULT_PROCESSORS)
 
     def deactivate_fixture(self):
         assert self._manager is not None
         assert self._global_captured is not None
         self._manager.transport.destinations = self._global_captured
+        if self.lean_capture:
+            self._manager.reconfigure(processors=LEAN_PROCESSORS)
 
     def grab_captured_output(self) -> str | None:
         if self._global_captured is None:
             return None
 
-        capture = _DeferredCapturedOutput.create(self._global_captured)
+        capture = _DeferredCapturedOutput.create(
+            self._global_captured, processors=LEAN_RENDER_PROCESSORS if self.lean_capture else ()
+        )
 
         if capture.is_empty():
             return None
@@ -123,17 +215,18 @@ class LogladyPlugin:
 
     @contextlib.contextmanager
     def item_capture(self, when: str, item: pytest.Item) -> Generator[None]:
-        self.start_global_capturing()
-        self.activate_fixture()
-        try:
-            yield
-        finally:
-            self.deactivate_fixture()
-            self.stop_global_capturing()
-            if (captured := self.grab_captured_output()) is not None:
-                # NOTE: The '*' in the key is load-bearing. Without it, pytest will try to use this section when
-                # dropping into `--pdb`, but that doesn't handle the deferred rendering string correctly.
-                item.add_report_section(when, "*loglady*", captured)
+        with manager_stack.isolated() if self.context_local_capture else contextlib.nullcontext():
+            self.start_global_capturing()
+            self.activate_fixture()
+            try:
+                yield
+            finally:
+                self.deactivate_fixture()
+                self.stop_global_capturing()
+                if (captured := self.grab_captured_output()) is not None:
+                    # NOTE: The '*' in the key is load-bearing. Without it, pytest will try to use this section when
+                    # dropping into `--pdb`, but that doesn't handle the deferred rendering string correctly.
+                    item.add_report_section(when, "*loglady*", captured)
 
     # Hooks
 
@@ -152,12 +245,69 @@ class LogladyPlugin:
         with self.item_capture("teardown", item):
             return (yield)
 
+    @pytest.hookimpl(wrapper=True)
+    def pytest_report_to_serializable(self, config: pytest.Config, report: pytest.TestReport | pytest.CollectReport):
+        data = yield
+
+        # pytest-xdist serializes reports to send them from the workers to the controller. Rather than formatting the
+        # captured records there, the records for failed tests are serialized and sent along with the report to be
+        # formatted by the controller, and those for passed tests aren't sent at all. The teardown report of a failed
+        # test is shown along with it, so it's sent even if teardown passed.
+        if data is None or not hasattr(config, "workerinput"):
+            return data
+
+        if report.failed:
+            self._failed_nodeids.add(report.nodeid)
+        failed = report.nodeid in self._failed_nodeids
+
+        sections: list[tuple[str, Any]] = []
+        shipped: list[tuple[int, bytes]] = []
+        for title, content in data.get("sections", ()):
+            if not isinstance(content, _DeferredCapturedOutput):
+                sections.append((title, content))
+            elif failed:
+                shipped.append((len(sections), content.serialize()))
+                sections.append((title, content.data))
+
+        data["sections"] = sections
+        if shipped:
+            data["loglady_sections"] = shipped
+
+        return data
+
+    @pytest.hookimpl(wrapper=True)
+    def pytest_report_from_serializable(self, config: pytest.Config, data: dict[str, Any]):
+        report = yield
+
+        if (shipped := getattr(report, "loglady_sections", None)) is None:
+            return report
+
+        del report.loglady_sections
+        for n, payload in shipped:
+            title, content = report.sections[n]
+            report.sections[n] = (title, _DeferredCapturedOutput.from_serialized(content, payload))
+
+        return report
+
     @pytest.hookimpl(wrapper=True, tryfirst=True)
     def pytest_terminal_summary(self, terminalreporter, exitstatus: pytest.ExitCode, config: pytest.Config):
         failed_or_errored_tests = {
             report.nodeid for report in [*terminalreporter.getreports("failed"), *terminalreporter.getreports("error")]
         }
 
+        # Everything is formatted up front so that it can be done in parallel.
+        _render_all(
+            [
+                content
+                for report in terminalreporter.getreports("")
+                if report.nodeid in failed_or_errored_tests
+                for _, content in getattr(report, "sections", ())
+                if isinstance(content, _DeferredCapturedOutput)
+            ],
+            use_color=self.use_color,
+            workers=self.render_workers,
+        )
+
         for category, reports in terminalreporter.stats.items():
             for report in reports:
                 if not hasattr(report, "sections"):
@@ -175,9 +325,14 @@ class LogladyPlugin:
 
         return (yield)
 
+    @pytest.hookimpl(trylast=True)
+    def pytest_sessionfinish(self) -> None:
+        self.stop_lean_capturing()
+
     @pytest.hookimpl(tryfirst=True)
     def pytest_keyboard_interrupt(self) -> None:
         self.stop_global_capturing()
+        self.stop_lean_capturing()
 
     @pytest.hookimpl(tryfirst=True)
     def pytest_internalerror(self) -> None:
@@ -188,55 +343,260 @@ class _DeferredCapturedOutput(UserString):
     def __init__(self, value: str):
         super().__init__(value)
         self.captured: CaptureDestination | None = None
+        self.processors: ProcessorList = ()
         self.rendered: str | None = None
 
     @classmethod
-    def create(cls, captured: CaptureDestination) -> _DeferredCapturedOutput:
+    def create(cls, captured: CaptureDestination, *, processors: ProcessorList = ()) -> _DeferredCapturedOutput:
+        """Defer rendering the captured records, running them through `processors` when they're rendered."""
         inst = cls(
             f"Captured {len(captured.records)} records. Loglady did not format these records because it thought no "
             f"one would ever try to look at them, pass --loglady-disable-deferred-formatting to force it to format "
             f"them anyway."
         )
         inst.captured = captured
+        inst.processors = processors
+        return inst
+
+    @classmethod
+    def from_serialized(cls, value: str, payload: bytes) -> _DeferredCapturedOutput:
+        """Recreate a deferred output from the result of serialize(), possibly in another process."""
+        records, discarded_records = pickle.loads(zlib.decompress(payload))
+        captured = CaptureDestination()
+        for data in records:
+            captured(pickle.loads(data))
+        captured.discarded_records = discarded_records
+
+        inst = cls(value)
+        inst.captured = captured
         return inst
 
+    def serialize(self) -> bytes:
+        """Compactly serialize the captured records, after running them through the processors.
+
+        Exceptions and stacktraces are extracted so they can be pickled, and
+        any other values that can't be pickled are replaced with stand-ins
+        that repr() the same way, so they're formatted just like the originals.
+        """
+        # Each record is pickled on its own, so one that can't be pickled only needs its own values checked.
+        records: list[bytes] = []
+        discarded_records = 0
+        if self.captured is not None:
+            discarded_records = self.captured.discarded_records
+            for record in self.captured.records:
+                if (processed := _process(self.processors, dict(record))) is not None:
+                    records.append(_pickle_record(portable_record(processed)))
+
+        return zlib.compress(pickle.dumps((records, discarded_records), protocol=pickle.HIGHEST_PROTOCOL))
+
     def is_empty(self) -> bool:
         return self.captured is None or len(self.captured.records) == 0
 
-    def render(self, *, use_color: bool = True) -> str:
+    def render(self, *, use_color: bool = True, renderer: _Renderer | None = None) -> str:
         if self.rendered is not None:
             return self.rendered
 
         if self.captured is None:
             return self.data
 
-        io = StringIO()
-        console = rich.console.Console(
-            file=io,
+        if renderer is None:
+            renderer = _Renderer(use_color=use_color)
+
+        self.rendered = renderer.render(self.captured, self.processors)
+        self.captured = None
+        return self.rendered
+
+
+class _Renderer:
+    """Formats captured records, reusing one console (and its theme) for everything it formats."""
+
+    def __init__(self, *, use_color: bool, width: int | None = None):
+        super().__init__()
+        self.console = rich.console.Console(
+            file=StringIO(),
+            width=width,
             force_terminal=use_color,
             force_interactive=False,
             force_jupyter=False,
         )
-        console_dest = RichConsoleDestination(console=console)
+        self.destination = RichConsoleDestination(console=self.console)
 
-        self.captured.playback(console_dest)
+    def render(self, captured: CaptureDestination, processors: ProcessorList) -> str:
+        io = StringIO()
+        self.console.file = io
+        # The formatters remember things like the last callsite, so each capture gets new ones.
+        self.destination.formatters = make_default_formatters()
+
+        captured.playback(_Processed(processors, self.destination) if processors else self.destination)
 
-        if self.captured.discarded_records > 0:
+        if captured.discarded_records > 0:
             io.write(
-                f"\n**** Discarded {self.captured.discarded_records} records, use --loglady-capture-limit to control capture limits. ****\n"
+                f"\n**** Discarded {captured.discarded_records} records, use --loglady-capture-limit to control capture limits. ****\n"
             )
 
-        self.captured = None
-        self.rendered = io.getvalue()
-        return self.rendered
+        return io.getvalue()
+
+
+# Starting worker processes takes a few hundred milliseconds, which is about as long as formatting this many records.
+PARALLEL_RENDER_MIN_RECORDS = 500
+# How long the worker processes get to format everything before the rest is formatted in the main process.
+PARALLEL_RENDER_TIMEOUT = 120.0
+
+
+def _render_all(contents: Sequence[_DeferredCapturedOutput], *, use_color: bool, workers: int) -> None:
+    """Format all of the given captured output, in worker processes if there's enough of it."""
+    pending = [content for content in contents if content.rendered is None and content.captured is not None]
+    if not pending:
+        return
+
+    renderer = _Renderer(use_color=use_color)
+    records = sum(len(content.captured.records) for content in pending if content.captured is not None)
+
+    if workers > 1 and len(pending) > 1 and records >= PARALLEL_RENDER_MIN_RECORDS:
+        try:
+            _render_in_workers(pending, use_color=use_color, width=renderer.console.width, workers=workers)
+        except Exception as err:  # noqa: BLE001
+            unrendered = sum(content.rendered is None for content in pending)
+            warn(CaptureRenderWarning(captures=unrendered, error=err), stacklevel=1)
+
+    for content in pending:
+        _ = content.render(renderer=renderer)
+
+
+def _render_in_workers(
+    contents: Sequence[_DeferredCapturedOutput], *, use_color: bool, width: int, workers: int
+) -> None:
+    context = multiprocessing.get_context("spawn")
+    pool = concurrent.futures.ProcessPoolExecutor(max_workers=min(workers, len(contents)), mp_context=context)
+    try:
+        futures = [
+            pool.submit(_render_serialized, content.data, content.serialize(), use_color=use_color, width=width)
+            for content in contents
+        ]
+        deadline = time.monotonic() + PARALLEL_RENDER_TIMEOUT
+        for content, future in zip(contents, futures, strict=True):
+            content.rendered = future.result(timeout=max(deadline - time.monotonic(), 0))
+            content.captured = None
+    finally:
+        # Don't wait on workers that are stuck, whatever's left is formatted in the main process.
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _render_serialized(value: str, payload: bytes, *, use_color: bool, width: int) -> str:
+    """Runs in a worker process."""
+    return _DeferredCapturedOutput.from_serialized(value, payload).render(
+        renderer=_worker_renderer(use_color=use_color, width=width)
+    )
+
+
+@functools.cache
+def _worker_renderer(*, use_color: bool, width: int) -> _Renderer:
+    return _Renderer(use_color=use_color, width=width)
+
+
+class _Processed(Destination):
+    def __init__(self, processors: ProcessorList, destination: Destination):
+        super().__init__()
+        self.processors = processors
+        self.destination = destination
+
+    @override
+    def __call__(self, record: Record) -> None:
+        if (processed := _process(self.processors, record)) is not None:
+            self.destination(processed)
+
+
+def _process(processors: ProcessorList, record: Record) -> Record | None:
+    processed: Record | None = record
+    for processor in processors:
+        if (processed := processor(processed)) is None:
+            return None
+    return processed
+
+
+def _pickle_record(record: Record) -> bytes:
+    try:
+        return pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception:  # noqa: BLE001
+        picklable = {key: value if _can_pickle(value) else _Unpicklable(repr(value)) for key, value in record.items()}
+        return pickle.dumps(picklable, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+class _Unpicklable:
+    """Stands in for a value that couldn't be pickled. It reprs as the original value did, so it's formatted the same."""
+
+    __slots__ = ("text",)
+
+    def __init__(self, text: str):
+        super().__init__()
+        self.text = text
+
+    @override
+    def __repr__(self) -> str:
+        return self.text
+
+
+def _can_pickle(value: Any) -> bool:
+    try:
+        _ = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception:  # noqa: BLE001
+        return False
+    return True
+
+
+class CapturedRecords(Sequence[Record]):
+    """The records captured by the loglady_capture fixture.
+
+    Along with being a sequence of records, this exposes the capture's indexed
+    find() and count_by() helpers, and clear() to throw away everything that's
+    been captured so far.
+    """
+
+    def __init__(self, capture: CaptureDestination):
+        super().__init__()
+        self._capture = capture
+
+    @overload
+    def __getitem__(self, n: int) -> Record: ...
+    @overload
+    def __getitem__(self, n: slice) -> list[Record]: ...
+    @override
+    def __getitem__(self, n: int | slice) -> Record | list[Record]:
+        if isinstance(n, slice):
+            return list(self._capture.records)[n]
+        return self._capture.records[n]
+
+    @override
+    def __len__(self) -> int:
+        return len(self._capture.records)
+
+    @override
+    def __iter__(self) -> Iterator[Record]:
+        return iter(self._capture.records)
+
+    @override
+    def __repr__(self) -> str:
+        return repr(list(self._capture.records))
+
+    def clear(self) -> None:
+        """Clear all captured records, along with their indexes"""
+        self._capture.reset()
+
+    def find(self, **fields: Any) -> list[Record]:
+        """Find all captured records that have the given fields, see CaptureDestination.find()"""
+        return self._capture.find(**fields)
+
+    def count_by(self, key: str) -> dict[Any, int]:
+        """Count the captured records by the value of the given key, see CaptureDestination.count_by()"""
+        return self._capture.count_by(key)
 
 
 @pytest.fixture
-def loglady_capture(request: pytest.FixtureRequest) -> Generator[Sequence[Record], None, None]:
+def loglady_capture(request: pytest.FixtureRequest) -> Generator[CapturedRecords, None, None]:
     """A fixture that captures global loglady logs and yields the list of captured logs"""
     plugin = request.config.pluginmanager.getplugin("loglady-plugin")
     assert isinstance(plugin, LogladyPlugin)
 
     capture = plugin.enable_fixture()
-    yield capture.records
+    yield CapturedRecords(capture)
     plugin.disable_fixture()
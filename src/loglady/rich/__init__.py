@@ -2,6 +2,8 @@
 # Published under the standard MIT License.
 # Full text available at: https://opensource.org/licenses/MIT
 
-from .destination import RichConsoleDestination
+from .destination import RichConsoleDestination, make_default_formatters
+from .offload import RenderPool
+from .summary import FloodSummarizer
 
-__all__ = ["RichConsoleDestination"]
+__all__ = ["FloodSummarizer", "RenderPool", "RichConsoleDestination", "make_default_formatters"]
@@ -10,8 +10,11 @@ so this module allows for log.trace() to print out the stacktrace.
 It's a lot of code. It's mostly because Thea can't leave well enough alone.
 """
 
+import copy
+import functools
 import linecache
 import os
+from collections import OrderedDict
 from collections.abc import Iterator
 from types import FrameType
 from typing import Any
@@ -22,7 +25,8 @@ from rich.console import Console, ConsoleOptions, RenderResult, group
 from rich.constrain import Constrain
 from rich.highlighter import RegexHighlighter
 from rich.panel import Panel
-from rich.pretty import Pretty
+from rich.pretty import Pretty, traverse
+from rich.segment import Segment
 from rich.style import Style
 from rich.syntax import Syntax
 from rich.table import Table
@@ -39,9 +43,21 @@ class Stacktrace:
         self.width = width
         self.extra_lines = extra_lines
         self.syntax_theme = syntax_theme
+        self.frames: list[_Stackframe] | None = None
+
+    def snapshot(self) -> "Stacktrace":
+        """Make a copy of this stacktrace that doesn't refer to any live frames.
+
+        The frames are summarized up front and their locals are converted to
+        Rich's pretty printing nodes, so the copy can be pickled and rendered
+        in another process.
+        """
+        snapshot = Stacktrace(None, width=self.width, extra_lines=self.extra_lines, syntax_theme=self.syntax_theme)
+        snapshot.frames = [frame.snapshot() for frame in _iter_stack(self.stack)]
+        return snapshot
 
     def __rich_console__(self, console: Console, options: ConsoleOptions) -> RenderResult:
-        frames = reversed(list(_iter_stack(self.stack)))
+        frames = reversed(self.frames if self.frames is not None else list(_iter_stack(self.stack)))
 
         traceback_theme = _make_theme()
 
@@ -80,9 +96,15 @@ class _Stackframe:
 
         self.is_hidden = (not self.is_from_file) or check_for_tracebackhide(frame)
 
+    def snapshot(self) -> "_Stackframe":
+        snapshot = copy.copy(self)
+        if self.locals is not None:
+            snapshot.locals = {key: traverse(value) for key, value in self.locals.items() if not key.startswith("__")}
+        return snapshot
+
     @property
-    def code(self):
-        return "".join(linecache.getlines(self.filename))
+    def has_source(self) -> bool:
+        return bool(linecache.getlines(self.filename))
 
     @property
     def relpath(self):
@@ -124,24 +146,10 @@ class _Stackframe:
 
     @group()
     def body(self, *, extra_lines: int, syntax_theme: str):
-        code = self.code
-        if not code:
+        if not self.has_source:
             return
 
-        yield Syntax(
-            code,
-            "python",
-            line_numbers=True,
-            line_range=(
-                self.lineno - extra_lines,
-                self.lineno + extra_lines,
-            ),
-            highlight_lines={self.lineno},
-            word_wrap=False,
-            indent_guides=True,
-            dedent=False,
-            theme=syntax_theme,
-        )
+        yield _SourceWindow(self.filename, self.lineno, extra_lines=extra_lines, syntax_theme=syntax_theme)
 
         if self.locals:
             yield Panel(
@@ -156,6 +164,74 @@ class _Stackframe:
             )
 
 
+class _SourceWindow:
+    """Renders the lines of source around a given line, highlighted.
+
+    Only the lines in the window are given to the highlighter, rather than the
+    whole file, and the rendered lines are kept in a bounded cache keyed by the
+    file, its modification time, the window, the theme, and the width. This
+    makes rendering the same frames over and over, like calling log.trace() in
+    a loop, cheap.
+    """
+
+    def __init__(self, filename: str, lineno: int, *, extra_lines: int, syntax_theme: str):
+        super().__init__()
+        self.filename = filename
+        self.lineno = lineno
+        self.extra_lines = extra_lines
+        self.syntax_theme = syntax_theme
+
+    def __rich_console__(self, console: Console, options: ConsoleOptions) -> RenderResult:
+        key = (
+            self.filename,
+            _mtime(self.filename),
+            self.lineno,
+            self.extra_lines,
+            self.syntax_theme,
+            options.max_width,
+        )
+
+        lines = _SOURCE_CACHE.get(key)
+        if lines is None:
+            lines = console.render_lines(self._syntax(), options, new_lines=True)
+            _SOURCE_CACHE[key] = lines
+            while len(_SOURCE_CACHE) > _SOURCE_CACHE_SIZE:
+                _ = _SOURCE_CACHE.popitem(last=False)
+        else:
+            _SOURCE_CACHE.move_to_end(key)
+
+        for line in lines:
+            yield from line
+
+    def _syntax(self) -> Syntax:
+        lines = linecache.getlines(self.filename)
+        start = max(self.lineno - self.extra_lines, 1)
+        end = min(self.lineno + self.extra_lines, len(lines))
+
+        return Syntax(
+            "".join(lines[start - 1 : end]).removesuffix("\n"),
+            "python",
+            line_numbers=True,
+            start_line=start,
+            highlight_lines={self.lineno},
+            word_wrap=False,
+            indent_guides=True,
+            dedent=False,
+            theme=self.syntax_theme,
+        )
+
+
+_SOURCE_CACHE_SIZE = 256
+_SOURCE_CACHE: OrderedDict[tuple[Any, ...], list[list[Segment]]] = OrderedDict()
+
+
+def _mtime(filename: str) -> int | None:
+    try:
+        return os.stat(filename).st_mtime_ns  # noqa: PTH116
+    except OSError:
+        return None
+
+
 class _PathHighlighter(RegexHighlighter):
     def __init__(self):
         super().__init__()
@@ -194,6 +270,7 @@ def _render_locals(frame_locals: dict[str, Any], *, hide_dunder: bool, hide_sund
     return table
 
 
+@functools.cache
 def _make_theme(name: str = "dracula") -> Theme:
     """Make a Rich theme from a pygments theme. Based on code in rich.traceback"""
     syntax_theme = Syntax.get_theme(name)
@@ -6,7 +6,8 @@
 A logging destination based on Rich's fancy-ass console output.
 """
 
-from collections.abc import Mapping
+from collections import Counter
+from collections.abc import Mapping, Sequence
 from typing import IO, override
 from warnings import warn
 
@@ -19,8 +20,11 @@ from rich.text import Text
 
 from loglady.destination import Destination
 from loglady.types import Record
+from loglady.warnings import DestinationErrorWarning
 
 from . import formatters
+from .offload import RenderPool
+from .summary import FloodSummarizer
 
 DEFAULT_THEME = rich.theme.Theme(
     {
@@ -29,6 +33,7 @@ DEFAULT_THEME = rich.theme.Theme(
         "log.thread": "default",
         "log.level": "default",
         "log.repeated": "grey23",
+        "log.summary": "grey62",
         "log.level.error": "bold red",
         "log.level.warning": "yellow",
         "log.level.success": "green",
@@ -47,7 +52,12 @@ DEFAULT_THEME = rich.theme.Theme(
 )
 
 
-def make_default_formatters():
+def make_default_formatters(*, render_pool: RenderPool | None = None):
+    """Make the default set of formatters.
+
+    If `render_pool` is given, tracebacks and stacktraces are rendered in its
+    worker processes.
+    """
     return dict(
         level=formatters.LevelFormatter(),
         message=formatters.MessageFormatter(),
@@ -55,8 +65,8 @@ def make_default_formatters():
         callsite=formatters.NonrepeatedFormatter(formatters.CallsiteFormatter()),
         items=formatters.RecordItemsFormatter(),
         thread=formatters.NonrepeatedFormatter(formatters.ThreadInfoFormatter(), fillchar="⋅", fill=True),
-        exception=formatters.ExceptionFormatter(),
-        stacktrace=formatters.StacktraceFormatter(),
+        exception=formatters.ExceptionFormatter(render_pool=render_pool),
+        stacktrace=formatters.StacktraceFormatter(render_pool=render_pool),
     )
 
 
@@ -108,7 +118,48 @@ class LineFormatter:
         return table
 
 
+def _simple_line(formatted, width: int) -> Text | None:
+    """Assemble formatted record parts into a single line laid out like LineFormatter's table.
+
+    Returns None if the record needs the full table layout: if it has an
+    exception or stacktrace, or if its message doesn't fit on a single line.
+    """
+    if formatted.get("exception") is not None or formatted.get("stacktrace") is not None:
+        return None
+
+    message = Text.assemble(formatted.get("message") or "", formatted.get("items") or "")
+    if "\n" in message.plain:
+        return None
+
+    # Column styles and widths match the ones used by LineFormatter's table, where the level and thread columns are
+    # a single cell wide and anything wider is cropped.
+    timestamp = Text.assemble(formatted.get("timestamp") or "", style="log.timestamp")
+    level = Text.assemble(formatted.get("level") or "", style="log.level")
+    level.truncate(1, overflow="crop", pad=True)
+    callsite = Text.assemble(formatted.get("callsite") or "", style="log.callsite")
+    thread = Text.assemble(formatted.get("thread") or "", style="log.thread")
+    thread.truncate(1, overflow="crop", pad=True)
+
+    padding = width - (timestamp.cell_len + level.cell_len + message.cell_len + callsite.cell_len + thread.cell_len + 4)
+    if padding < 0:
+        return None
+
+    return Text.assemble(timestamp, " ", level, " ", message, " " * padding, " ", callsite, " ", thread)
+
+
 class RichConsoleDestination(Destination):
+    """Outputs records to a Rich console.
+
+    With `fast=True`, records that fit on a single line and don't have an
+    exception or stacktrace skip LineFormatter and are assembled directly into
+    a single line of text, avoiding a Table and a full layout pass for each
+    record. Other records still use the line formatter.
+
+    If a `summarizer` is given, it's used to detect floods of records: while
+    the rate of records is above its threshold, they aren't printed and a
+    summary of each interval is printed instead.
+    """
+
     def __init__(
         self,
         *,
@@ -117,6 +168,8 @@ class RichConsoleDestination(Destination):
         theme=DEFAULT_THEME,
         io: IO[str] | None = None,
         console: rich.console.Console | None = None,
+        fast: bool = False,
+        summarizer: FloodSummarizer | None = None,
     ):
         super().__init__()
 
@@ -135,11 +188,32 @@ class RichConsoleDestination(Destination):
         if line_formatter is None:
             line_formatter = LineFormatter()
         self.line_formatter = line_formatter
+        self.fast = fast
+        self.summarizer = summarizer
+
+    @property
+    def stats(self) -> Counter[str]:
+        """Counters collected from this destination's formatters, keyed by "formatter_name.counter_name"."""
+        stats: Counter[str] = Counter()
+        for name, fn in self.formatters.items():
+            for key, value in getattr(fn, "stats", {}).items():
+                stats[f"{name}.{key}"] += value
+        if self.summarizer is not None:
+            for key, value in self.summarizer.stats.items():
+                stats[f"summarizer.{key}"] += value
+        return stats
 
     @override
     def __call__(self, record: Record):
         c = self.console
 
+        if self.summarizer is not None:
+            summarized = self.summarizer.observe(record)
+            for summary in self.summarizer.pop_summaries():
+                c.print(summary)
+            if summarized:
+                return
+
         formatted = {}
         for name, fn in self.formatters.items():
             try:
@@ -147,5 +221,28 @@ class RichConsoleDestination(Destination):
             except Exception as err:  # noqa: BLE001
                 warn(f"exception while invoking formatter {fn!r}: {err!r}", stacklevel=1)
 
+        if self.fast and (line := _simple_line(formatted, c.width)) is not None:
+            # The line is already exactly as wide as the console, so there's nothing for print() to wrap or crop.
+            c.print(line, soft_wrap=True)
+            return
+
         for line in self.line_formatter(formatted):
             c.print(line)
+
+    @override
+    def batch(self, records: Sequence[Record]) -> None:
+        # Inside the console's context, everything printed is buffered and then written out with a single write when
+        # the context exits. Records are still formatted one at a time and in order, so NonrepeatedFormatter keeps
+        # working across the batch.
+        with self.console:
+            for record in records:
+                try:
+                    self(record)
+                except Exception as err:  # noqa: BLE001
+                    warn(DestinationErrorWarning(destination=self, error=err), stacklevel=1)
+
+    @override
+    def flush(self):
+        if self.summarizer is not None:
+            for summary in self.summarizer.flush():
+                self.console.print(summary)
@@ -6,8 +6,14 @@
 Formatters for RichConsoleDestination
 """
 
-from collections.abc import Callable, Iterable
-from dataclasses import dataclass
+from __future__ import annotations
+
+import functools
+import reprlib
+import time
+from collections import Counter, OrderedDict
+from collections.abc import Callable, Hashable, Iterable
+from dataclasses import dataclass, field
 from types import MappingProxyType, ModuleType
 
 import rich
@@ -20,12 +26,30 @@ from loglady.threading import thread_emoji
 from loglady.types import Record
 
 from ._stacktrace import Stacktrace
+from .offload import Offloaded, RenderPool
 
 type Formatter = Callable[[Record], rich.console.RenderableType | None]
 
 
 @dataclass
 class ExceptionFormatter:
+    """Formats the record's exception as a Rich traceback.
+
+    If `dedupe_window` is set, exceptions are fingerprinted by their type and
+    the code and line of each frame in their traceback. Each fully rendered
+    traceback is numbered, and a repeat of the same exception within
+    `dedupe_window` seconds is rendered as a single line referring back to it
+    instead of rendering the whole traceback again. At most
+    `dedupe_max_entries` fingerprints are remembered.
+
+    If `render_pool` is set, the traceback is extracted here but rendered in
+    one of the pool's worker processes.
+
+    The exception can also be a rich.traceback.Trace that was extracted
+    earlier, possibly in another process (see offload.portable_record()). These
+    are rendered as-is and aren't deduplicated.
+    """
+
     width: int | None = None
     extra_lines: int = 1
     theme: str | None = "github-dark"
@@ -38,6 +62,11 @@ class ExceptionFormatter:
     indent_guides: bool = True
     suppress: Iterable[str | ModuleType] = ()
     max_frames: int = 100
+    dedupe_window: float | None = None
+    dedupe_max_entries: int = 256
+    render_pool: RenderPool | None = None
+    stats: Counter[str] = field(init=False, repr=False, default_factory=Counter)
+    _seen: OrderedDict[Hashable, _SeenException] = field(init=False, repr=False, default_factory=OrderedDict)
 
     def __call__(self, record):
         exc = record.pop("exception", None)
@@ -45,8 +74,45 @@ class ExceptionFormatter:
         if exc is None or exc == (None, None, None):
             return None
 
-        return rich.traceback.Traceback.from_exception(
+        if isinstance(exc, rich.traceback.Trace):
+            return self._render_trace(exc)
+
+        if self.dedupe_window is None:
+            return self._render(exc)
+
+        fingerprint = _exception_fingerprint(*exc)
+        now = time.monotonic()
+        seen = self._seen.get(fingerprint)
+
+        if seen is not None and now - seen.rendered_at <= self.dedupe_window:
+            seen.count += 1
+            self._seen.move_to_end(fingerprint)
+            self.stats["exceptions_deduplicated"] += 1
+            return Text(f"same traceback as #{seen.number} (×{seen.count})", style="log.repeated")  # noqa: RUF001
+
+        number = self.stats["exceptions_rendered"] + 1
+        self._seen[fingerprint] = _SeenException(number=number, rendered_at=now)
+        self._seen.move_to_end(fingerprint)
+        while len(self._seen) > self.dedupe_max_entries:
+            _ = self._seen.popitem(last=False)
+
+        return rich.console.Group(Text(f"#{number}", style="traceback.border"), self._render(exc))
+
+    def _render(self, exc):
+        trace = rich.traceback.Traceback.extract(
             *exc,
+            show_locals=self.show_locals,
+            locals_max_length=self.locals_max_length,
+            locals_max_string=self.locals_max_string,
+            locals_hide_dunder=self.locals_hide_dunder,
+            locals_hide_sunder=self.locals_hide_sunder,
+        )
+        return self._render_trace(trace)
+
+    def _render_trace(self, trace: rich.traceback.Trace):
+        self.stats["exceptions_rendered"] += 1
+        traceback = rich.traceback.Traceback(
+            trace,
             width=self.width,
             extra_lines=self.extra_lines,
             theme=self.theme,
@@ -61,15 +127,49 @@ class ExceptionFormatter:
             max_frames=self.max_frames,
         )
 
+        if self.render_pool is not None:
+            return Offloaded(self.render_pool, traceback)
+
+        return traceback
+
+
+@dataclass(slots=True)
+class _SeenException:
+    number: int
+    rendered_at: float
+    count: int = 1
+
+
+def _exception_fingerprint(exc_type, exc, traceback, depth: int = 0) -> Hashable:
+    """Identify an exception by its type and where it was raised, including any exceptions it was chained to."""
+    frames = []
+    while traceback is not None:
+        frames.append((traceback.tb_frame.f_code, traceback.tb_lineno))
+        traceback = traceback.tb_next
+
+    chained = (exc.__cause__ or exc.__context__) if exc is not None else None
+    if chained is not None and depth < 10:
+        chained = _exception_fingerprint(type(chained), chained, chained.__traceback__, depth + 1)
+
+    return (exc_type, tuple(frames), chained)
+
 
 class StacktraceFormatter:
-    def __init__(self):
+    def __init__(self, *, render_pool: RenderPool | None = None):
         super().__init__()
+        self.render_pool = render_pool
 
     def __call__(self, record):
         if (stack := record.pop("stacktrace", None)) is None:
             return None
-        return Stacktrace(stack)
+
+        # Already snapshotted, see offload.portable_record().
+        stacktrace = stack if isinstance(stack, Stacktrace) else Stacktrace(stack)
+
+        if self.render_pool is not None:
+            return Offloaded(self.render_pool, stacktrace.snapshot() if stacktrace.frames is None else stacktrace)
+
+        return stacktrace
 
 
 DEFAULT_LEVEL_TO_TEXT = MappingProxyType(
@@ -96,6 +196,22 @@ class LevelFormatter:
 
 
 class MessageFormatter:
+    """Formats the record's message, prefix, and icon.
+
+    Messages are parsed as Rich markup, and since the same messages tend to be
+    logged over and over again, parsed messages are kept in an LRU cache of
+    `cache_size` entries keyed by the text and level. Pass markup=False to
+    treat messages as plain text and skip parsing altogether.
+
+    `stats["markup_parses"]` counts how many times the markup parser ran.
+    """
+
+    def __init__(self, *, markup: bool = True, cache_size: int = 1024):
+        super().__init__()
+        self.markup = markup
+        self.stats: Counter[str] = Counter()
+        self._parse = functools.lru_cache(maxsize=cache_size)(self._parse_markup)
+
     def __call__(self, record: Record):
         level = record.get("level", "notset")
         msg = record.pop("msg")
@@ -104,9 +220,17 @@ class MessageFormatter:
         if icon:
             icon = f" {icon} "
 
-        formatted = Text.from_markup(text=f"{prefix if prefix else ''}{icon}{msg} ", style=f"log.level.{level}")
+        text = f"{prefix if prefix else ''}{icon}{msg} "
+
+        if not self.markup:
+            return Text(text, style=f"log.level.{level}")
+
+        # Cached Text instances are shared, so hand out a copy in case someone downstream modifies it.
+        return self._parse(text, level).copy()
 
-        return formatted
+    def _parse_markup(self, text: str, level: str) -> Text:
+        self.stats["markup_parses"] += 1
+        return Text.from_markup(text=text, style=f"log.level.{level}")
 
 
 class TimestampFormatter:
@@ -197,10 +321,48 @@ DEFAULT_IGNORED_KEYS = frozenset(
 
 
 class RecordItemsFormatter:
-    def __init__(self, ignored_keys=DEFAULT_IGNORED_KEYS):
+    """Formats the record's extra fields as key=value pairs.
+
+    Values are repr()'d in the style of reprlib, so that a huge value can't
+    stall rendering: strings and other reprs are limited to `max_length`
+    characters, containers to `max_items` items, and nesting to `max_depth`
+    levels. These limits apply by default, so unlike a plain repr(), long
+    values are truncated unless larger limits are passed. Strings, ints, and
+    floats are styled directly without running the highlighter over them, and
+    other values' highlighted reprs are kept in an LRU cache of `cache_size`
+    entries, keyed by the repr text (pass 0 to disable it).
+
+    `stats["reprs_highlighted"]` counts how many times the highlighter ran.
+    """
+
+    def __init__(
+        self,
+        ignored_keys=DEFAULT_IGNORED_KEYS,
+        *,
+        max_length: int = 200,
+        max_items: int = 10,
+        max_depth: int = 3,
+        cache_size: int = 256,
+    ):
         super().__init__()
         self.ignored_keys = ignored_keys
+        self.max_length = max_length
+        self.stats: Counter[str] = Counter()
         self._hl = rich.highlighter.ReprHighlighter()
+        self._repr = reprlib.Repr(
+            maxlevel=max_depth,
+            maxtuple=max_items,
+            maxlist=max_items,
+            maxarray=max_items,
+            maxdict=max_items,
+            maxset=max_items,
+            maxfrozenset=max_items,
+            maxdeque=max_items,
+            maxstring=max_length,
+            maxlong=max_length,
+            maxother=max_length,
+        )
+        self._cached_highlight = functools.lru_cache(maxsize=cache_size)(self._highlight) if cache_size else None
 
     def __call__(self, record: Record):
         return Text.assemble(*self._gen_items(record))
@@ -216,10 +378,29 @@ class RecordItemsFormatter:
                     yield Text("true", "repr.bool_true") if v else Text("false", "repr.bool_false")
                 case None:
                     yield Text("none", "repr.none")
+                case int() | float():
+                    yield Text(self._repr.repr(v), "repr.number")
+                case str():
+                    yield Text(self._repr.repr(v), "repr.str")
                 case _:
-                    yield self._hl(repr(v))
+                    yield self._highlight_repr(v)
             yield " "
 
+    def _highlight_repr(self, value: object) -> Text:
+        text = self._repr.repr(value)
+        if len(text) > self.max_length:
+            text = f"{text[: self.max_length - 3]}..."
+
+        # Keyed by the text rather than the value, since values that compare equal, like (1, 2) and (1.0, 2.0), can
+        # have different reprs.
+        if self._cached_highlight is not None:
+            return self._cached_highlight(text)
+        return self._highlight(text)
+
+    def _highlight(self, text: str) -> Text:
+        self.stats["reprs_highlighted"] += 1
+        return self._hl(text)
+
 
 class ThreadInfoFormatter:
     def __call__(self, record: Record):
@@ -0,0 +1,194 @@
+# Copyright (c) 2025 Alethea Katherine Flowers.
+# Published under the standard MIT License.
+# Full text available at: https://opensource.org/licenses/MIT
+
+"""Render tracebacks and stacktraces in a worker process.
+
+Rendering a traceback or stacktrace means reading source files, running them
+through the syntax highlighter, and pretty printing locals. All of that holds
+the GIL, so a burst of exceptions being logged slows down every other thread
+in the application. A RenderPool moves that work into a worker process: the
+formatters extract a picklable summary of the traceback or stacktrace
+in-process, the worker renders it to ANSI text, and the destination prints
+that text. Records without a traceback or stacktrace never touch the pool.
+
+portable_record() does the same extraction for a whole record, so that it can
+be pickled and rendered by a RichConsoleDestination in another process.
+"""
+
+from __future__ import annotations
+
+import concurrent.futures
+import io
+import multiprocessing
+import threading
+from collections.abc import Mapping
+from concurrent.futures import Future
+from warnings import warn
+from weakref import WeakKeyDictionary
+
+import rich.traceback
+from rich.console import Console, ConsoleOptions, ConsoleRenderable, RenderResult
+from rich.default_styles import DEFAULT_STYLES
+from rich.style import Style
+from rich.text import Text
+from rich.theme import Theme
+
+from loglady.types import Record
+from loglady.warnings import RenderPoolWarning
+
+from ._stacktrace import Stacktrace
+
+
+class RenderPool:
+    """A pool of worker processes that render Rich renderables to ANSI text.
+
+    Pass a RenderPool to make_default_formatters() (or directly to
+    ExceptionFormatter and StacktraceFormatter) to render tracebacks and
+    stacktraces in a worker process.
+
+    Workers are started lazily, the first time something needs rendering, using
+    the "spawn" start method by default. Spawned workers re-import the main
+    module, so it must be guarded with `if __name__ == "__main__":`. If the pool
+    breaks or a render takes longer than `timeout` seconds, the renderable is
+    rendered in-process instead.
+    """
+
+    def __init__(self, *, max_workers: int = 1, mp_context: str | None = "spawn", timeout: float | None = 30.0):
+        super().__init__()
+        self.max_workers = max_workers
+        self.mp_context = mp_context
+        self.timeout = timeout
+        self._executor: concurrent.futures.ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    def submit(
+        self,
+        renderable: ConsoleRenderable,
+        *,
+        width: int,
+        color_system: str | None,
+        styles: Mapping[str, Style] | None = None,
+    ) -> Future[str]:
+        """Render the renderable in a worker process, returning a future for the ANSI text.
+
+        The worker renders with the default theme, with `styles` applied on top
+        of it.
+        """
+        return self._get_executor().submit(_render_to_ansi, renderable, width, color_system, styles)
+
+    def shutdown(self, *, wait: bool = True):
+        """Stop the worker processes. The pool will start new ones if it's used again."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+    def _get_executor(self) -> concurrent.futures.ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                context = multiprocessing.get_context(self.mp_context) if self.mp_context else None
+                self._executor = concurrent.futures.ProcessPoolExecutor(
+                    max_workers=self.max_workers, mp_context=context
+                )
+            return self._executor
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+
+
+class Offloaded:
+    """A renderable that's rendered by a RenderPool.
+
+    The renderable must be picklable. It's submitted to the pool when the
+    console renders this, using the console's width, color system, and theme,
+    and the resulting ANSI text is printed in its place.
+    """
+
+    def __init__(self, pool: RenderPool, renderable: ConsoleRenderable):
+        super().__init__()
+        self.pool = pool
+        self.renderable = renderable
+
+    def __rich_console__(self, console: Console, options: ConsoleOptions) -> RenderResult:
+        try:
+            future = self.pool.submit(
+                self.renderable,
+                width=options.max_width,
+                color_system=console.color_system,
+                styles=_changed_styles(console),
+            )
+            ansi = future.result(timeout=self.pool.timeout)
+        except Exception as err:  # noqa: BLE001
+            warn(RenderPoolWarning(renderable=self.renderable, error=err), stacklevel=1)
+            yield self.renderable
+            return
+
+        yield Text.from_ansi(ansi.removesuffix("\n"), no_wrap=True, overflow="crop")
+
+
+def portable_record(record: Record) -> Record:
+    """Make a copy of the record with its exception and stacktrace in a form that can be pickled.
+
+    The exception is extracted into a rich.traceback.Trace and the stacktrace
+    is snapshotted, both of which RichConsoleDestination renders just like the
+    originals. Other fields are copied as they are.
+    """
+    portable = dict(record)
+
+    exc = portable.get("exception")
+    if exc is not None and exc != (None, None, None):
+        portable["exception"] = rich.traceback.Traceback.extract(*exc)
+
+    if (stack := portable.get("stacktrace")) is not None and not isinstance(stack, Stacktrace):
+        portable["stacktrace"] = Stacktrace(stack).snapshot()
+
+    return portable
+
+
+# The styles that each console's theme changes, along with the console's styles they were found for. Pushing or
+# popping a theme gives the console a different dict of styles, so they're only found again when that happens.
+_CHANGED_STYLES: WeakKeyDictionary[Console, tuple[dict[str, Style], dict[str, Style]]] = WeakKeyDictionary()
+
+
+def _changed_styles(console: Console) -> dict[str, Style]:
+    """Find the styles that the console's theme changes from the default theme, so the worker can apply them."""
+    current = console._theme_stack._entries[-1]  # pyright: ignore[reportPrivateUsage]
+    if (cached := _CHANGED_STYLES.get(console)) is not None and cached[0] is current:
+        return cached[1]
+
+    # Imported here since this module is imported by the formatters.
+    from .destination import DEFAULT_THEME  # noqa: PLC0415
+
+    defaults = DEFAULT_STYLES | DEFAULT_THEME.styles
+    changed = {
+        name: style
+        for name, default in defaults.items()
+        if (style := console.get_style(name, default=default)) != default
+    }
+    _CHANGED_STYLES[console] = (current, changed)
+    return changed
+
+
+def _render_to_ansi(
+    renderable: ConsoleRenderable, width: int, color_system: str | None, styles: Mapping[str, Style] | None
+) -> str:
+    """Runs in the worker process."""
+    from .destination import DEFAULT_THEME  # noqa: PLC0415
+
+    file = io.StringIO()
+    console = Console(
+        file=file,
+        width=width,
+        color_system=color_system,  # pyright: ignore[reportArgumentType]
+        force_terminal=color_system is not None,
+        theme=DEFAULT_THEME,
+    )
+    if styles:
+        console.push_theme(Theme(dict(styles)))
+    console.print(renderable)
+    return file.getvalue()
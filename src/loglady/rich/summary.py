@@ -0,0 +1,140 @@
+# Copyright (c) 2025 Alethea Katherine Flowers.
+# Published under the standard MIT License.
+# Full text available at: https://opensource.org/licenses/MIT
+
+"""Summarizing floods of records on the console.
+
+A terminal can only usefully show so many lines a second, and printing
+thousands of them makes the terminal the bottleneck for the whole transport.
+FloodSummarizer watches the rate of records going to a RichConsoleDestination
+and, when it goes above a threshold, has the destination print a summary of
+each interval instead of every record. It switches back once the rate drops.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import Counter
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+from rich.text import Text
+
+from loglady.levels import severity
+from loglady.types import Record
+
+
+@dataclass(kw_only=True)
+class FloodSummarizer:
+    """Decides when a console destination should summarize records instead of printing them.
+
+    Records are counted in intervals of `interval` seconds. As soon as more
+    than `threshold` records a second have been seen in an interval, records
+    are summarized: counted by level and callsite, with the first `samples`
+    messages kept as examples. At the end of each summarized interval the
+    destination prints the summary, and if that interval's rate was at or
+    below the threshold, it goes back to printing every record. Records at
+    `always_print` or above, warnings by default, are never summarized, so
+    errors in the middle of a flood of debug records are still printed.
+
+    An interval is only closed by the next record or by flush(), so the summary
+    of the last interval of a flood is printed when the destination is flushed
+    (which happens when loglady is shut down or at exit) if no more records
+    follow it.
+
+    This only affects the console. Other destinations still get every record.
+    """
+
+    threshold: float = 500
+    interval: float = 1.0
+    samples: int = 3
+    top_callsites: int = 3
+    always_print: str = "warning"
+    clock: Callable[[], float] = time.monotonic
+    summarizing: bool = field(init=False, default=False)
+    stats: Counter[str] = field(init=False, repr=False, default_factory=Counter)
+    _window_start: float | None = field(init=False, repr=False, default=None)
+    _window_count: int = field(init=False, repr=False, default=0)
+    _summary: _Summary | None = field(init=False, repr=False, default=None)
+    _pending: list[Text] = field(init=False, repr=False, default_factory=list)
+
+    def observe(self, record: Record) -> bool:
+        """Count the record, returning True if it's been summarized and shouldn't be printed."""
+        now = self.clock()
+
+        if self._window_start is None:
+            self._window_start = now
+        elif now - self._window_start >= self.interval:
+            rate = self._window_count / (now - self._window_start)
+            self._close_summary(now)
+            self.summarizing = rate > self.threshold
+            self._window_start = now
+            self._window_count = 0
+
+        self._window_count += 1
+
+        if not self.summarizing and self._window_count > self.threshold * self.interval:
+            self.summarizing = True
+
+        if not self.summarizing or severity(record.get("level")) >= severity(self.always_print):
+            return False
+
+        if self._summary is None:
+            self._summary = _Summary(started_at=now)
+        self._summary.add(record, samples=self.samples)
+        self.stats["records_summarized"] += 1
+        return True
+
+    def pop_summaries(self) -> list[Text]:
+        """Get any summaries of completed intervals that are waiting to be printed."""
+        pending, self._pending = self._pending, []
+        return pending
+
+    def flush(self) -> list[Text]:
+        """Summarize the records seen so far in the current interval, along with any waiting summaries."""
+        self._close_summary(self.clock())
+        return self.pop_summaries()
+
+    def _close_summary(self, now: float):
+        if self._summary is None:
+            return
+
+        self._pending.append(self._summary.render(now, top_callsites=self.top_callsites))
+        self._summary = None
+        self.stats["summaries"] += 1
+
+
+@dataclass
+class _Summary:
+    started_at: float
+    count: int = 0
+    levels: Counter[str] = field(default_factory=Counter)
+    callsites: Counter[str] = field(default_factory=Counter)
+    samples: list[str] = field(default_factory=list)
+
+    def add(self, record: Record, *, samples: int):
+        self.count += 1
+        self.levels[record.get("level", "notset")] += 1
+        callsite = f"{record.get('call_module', '?')}.{record.get('call_fn', '?')}:{record.get('call_lineno', '?')}"
+        self.callsites[callsite] += 1
+        if len(self.samples) < samples:
+            self.samples.append(str(record.get("msg", "")))
+
+    def render(self, now: float, *, top_callsites: int) -> Text:
+        elapsed = max(now - self.started_at, 0.001)
+
+        text = Text(style="log.summary")
+        text.append(f"⋯ {self.count:,} records in {elapsed:.1f}s ({self.count / elapsed:,.0f}/s): ")
+        text.append_text(
+            Text(", ").join(
+                Text(f"{n:,} {level}", style=f"log.level.{level}") for level, n in self.levels.most_common()
+            )
+        )
+
+        callsites = ", ".join(f"{callsite} ×{n:,}" for callsite, n in self.callsites.most_common(top_callsites))  # noqa: RUF001
+        text.append(f"\n  top callsites: {callsites}")
+
+        for sample in self.samples:
+            text.append(f"\n  e.g. {sample}")
+
+        return text
@@ -0,0 +1,126 @@
+# Copyright (c) 2025 Alethea Katherine Flowers.
+# Published under the standard MIT License.
+# Full text available at: https://opensource.org/licenses/MIT
+
+"""Per-destination filtering.
+
+Destinations declare which records they want by being wrapped in a
+FilteredDestination. Transports compile their destinations into a
+RoutingTable so that each record is only handed to the destinations that
+want it, without every destination having to re-check the record itself.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping, Sequence
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, override
+
+from .destination import Destination
+from .levels import LEVELS, severity
+from .types import Record
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class Filter:
+    """Describes which records a destination wants. A record must match all given conditions:
+
+    - min_level: the record's level must be at least this severe.
+    - has_keys: the record must have all of these keys.
+    - equals: the record must have these keys with exactly these values.
+    - module_prefix: the record's call_module must start with this prefix (or one of these prefixes).
+    """
+
+    min_level: str | None = None
+    has_keys: frozenset[str] = frozenset()
+    equals: Mapping[str, Any] = field(default_factory=lambda: MappingProxyType({}))
+    module_prefix: str | tuple[str, ...] | None = None
+
+    def __post_init__(self):
+        if self.min_level is not None and self.min_level not in LEVELS:
+            msg = f"unknown level {self.min_level!r}, expected one of {', '.join(LEVELS)}"
+            raise ValueError(msg)
+
+    @property
+    def has_field_conditions(self) -> bool:
+        return bool(self.has_keys or self.equals or self.module_prefix is not None)
+
+    def allows_level(self, level: str | None) -> bool:
+        return self.min_level is None or severity(level) >= severity(self.min_level)
+
+    def matches_fields(self, record: Record) -> bool:
+        if self.has_keys and not record.keys() >= self.has_keys:
+            return False
+
+        for key, value in self.equals.items():
+            if key not in record or record[key] != value:
+                return False
+
+        return self.module_prefix is None or str(record.get("call_module", "")).startswith(self.module_prefix)
+
+    def __call__(self, record: Record) -> bool:
+        return self.allows_level(record.get("level")) and self.matches_fields(record)
+
+
+@dataclass(slots=True)
+class FilteredDestination(Destination):
+    """A destination that only outputs records matching its filter.
+
+    Transports recognize these and skip them entirely for records they don't
+    want, but they also work as plain destinations anywhere else.
+    """
+
+    destination: Destination
+    filter: Filter
+
+    @override
+    def __call__(self, record: Record) -> None:
+        if self.filter(record):
+            self.destination(record)
+
+    @override
+    def batch(self, records: Sequence[Record]) -> None:
+        self.destination.batch([record for record in records if self.filter(record)])
+
+    @override
+    def flush(self):
+        self.destination.flush()
+
+
+type Route = tuple[Filter | None, Destination]
+
+
+class RoutingTable:
+    """Destinations compiled into a table indexed by level.
+
+    Level conditions are resolved once, when the table is built, so finding
+    the destinations for a record is a single dict lookup. Field conditions
+    are only checked for the destinations that have them.
+    """
+
+    def __init__(self, destinations: Iterable[Destination]):
+        super().__init__()
+        compiled = [_compile_route(dest) for dest in destinations]
+        self._by_level = {level: _routes_for_level(compiled, level) for level in LEVELS}
+        self._default = self._by_level["notset"]
+
+    def routes(self, record: Record) -> tuple[Route, ...]:
+        """Get the routes for the record's level. A route's filter is None if it doesn't need any further checks."""
+        return self._by_level.get(record.get("level", "notset"), self._default)
+
+
+def _compile_route(dest: Destination) -> tuple[Filter | None, Destination]:
+    if isinstance(dest, FilteredDestination):
+        return dest.filter, dest.destination
+    return None, dest
+
+
+def _routes_for_level(compiled: list[tuple[Filter | None, Destination]], level: str) -> tuple[Route, ...]:
+    routes: list[Route] = []
+    for record_filter, dest in compiled:
+        if record_filter is None:
+            routes.append((None, dest))
+        elif record_filter.allows_level(level):
+            routes.append((record_filter if record_filter.has_field_conditions else None, dest))
+    return tuple(routes)
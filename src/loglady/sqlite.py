@@ -0,0 +1,322 @@
+# Copyright (c) 2025 Alethea Katherine Flowers.
+# Published under the standard MIT License.
+# Full text available at: https://opensource.org/licenses/MIT
+
+"""A destination that writes records to a local SQLite database, and tools for querying it.
+
+Records are inserted in batches, one transaction per batch, into a database
+using a WAL journal. The columns that are useful for narrowing down records
+(timestamp, level, call_module, and thread) are indexed, and everything else
+is stored as JSON in the "extra" column.
+
+The database can be queried with `query()` or from the command line:
+
+    python3 -m loglady query logs.sqlite --level error --since 10m
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import json
+import re
+import sqlite3
+import sys
+import threading
+import time
+import traceback
+from collections.abc import Iterator, Sequence
+from os import PathLike
+from typing import Any, override
+from warnings import warn
+
+from .destination import Destination
+from .levels import severity
+from .types import Record
+from .warnings import DestinationErrorWarning
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    id INTEGER PRIMARY KEY,
+    timestamp REAL NOT NULL,
+    level TEXT NOT NULL,
+    severity INTEGER NOT NULL,
+    msg TEXT,
+    call_module TEXT,
+    call_fn TEXT,
+    call_filename TEXT,
+    call_lineno INTEGER,
+    thread_id INTEGER,
+    thread_name TEXT,
+    exception TEXT,
+    stacktrace TEXT,
+    extra TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS records_timestamp ON records (timestamp);
+CREATE INDEX IF NOT EXISTS records_severity ON records (severity, timestamp);
+CREATE INDEX IF NOT EXISTS records_call_module ON records (call_module, timestamp);
+CREATE INDEX IF NOT EXISTS records_thread_id ON records (thread_id, timestamp);
+"""
+
+_INSERT = """
+INSERT INTO records (
+    timestamp, level, severity, msg, call_module, call_fn, call_filename, call_lineno,
+    thread_id, thread_name, exception, stacktrace, extra
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_COLUMN_KEYS = frozenset(
+    {
+        "timestamp",
+        "level",
+        "msg",
+        "call_module",
+        "call_fn",
+        "call_filename",
+        "call_lineno",
+        "thread_id",
+        "thread_name",
+        "exception",
+        "stacktrace",
+    }
+)
+
+
+class SQLiteDestination(Destination):
+    """Writes records into a SQLite database.
+
+    Records are buffered and inserted `batch_size` at a time in a single
+    transaction. flush() writes out any buffered records.
+    """
+
+    def __init__(self, path: str | PathLike[str], *, batch_size: int = 100):
+        super().__init__()
+        self.path = path
+        self.batch_size = batch_size
+        self._pending: list[tuple[Any, ...]] = []
+        # Records are usually written from the transport's thread but flush() can be called from any thread.
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    @override
+    def __call__(self, record: Record) -> None:
+        row = _record_to_row(record)
+        with self._lock:
+            self._pending.append(row)
+            if len(self._pending) >= self.batch_size:
+                self._write_pending()
+
+    @override
+    def batch(self, records: Sequence[Record]) -> None:
+        # Each record is converted on its own, so one that can't be doesn't take the rest of the batch with it.
+        rows: list[tuple[Any, ...]] = []
+        for record in records:
+            try:
+                rows.append(_record_to_row(record))
+            except Exception as err:  # noqa: BLE001
+                warn(DestinationErrorWarning(destination=self, error=err), stacklevel=1)
+        with self._lock:
+            self._pending.extend(rows)
+            if len(self._pending) >= self.batch_size:
+                self._write_pending()
+
+    @override
+    def flush(self):
+        with self._lock:
+            self._write_pending()
+
+    def close(self):
+        """Write any buffered records and close the database."""
+        with self._lock:
+            self._write_pending()
+            self._conn.close()
+
+    def _write_pending(self):
+        if not self._pending:
+            return
+
+        try:
+            with self._conn:
+                self._conn.execute("BEGIN")
+                self._conn.executemany(_INSERT, self._pending)
+        except (sqlite3.Error, OverflowError):
+            # Something in the batch couldn't be written, so write the rows one at a time and drop the bad ones
+            # rather than letting them block every later batch.
+            self._write_rows_individually()
+        finally:
+            self._pending.clear()
+
+    def _write_rows_individually(self):
+        for row in self._pending:
+            try:
+                with self._conn:
+                    self._conn.execute(_INSERT, row)
+            except (sqlite3.Error, OverflowError) as err:
+                warn(DestinationErrorWarning(destination=self, error=err), stacklevel=1)
+
+
+def _record_to_row(record: Record) -> tuple[Any, ...]:
+    timestamp = record.get("timestamp")
+    level = record.get("level") or "notset"
+
+    exception = record.get("exception")
+    if exception is not None and exception != (None, None, None):
+        exception = "".join(traceback.format_exception(*exception))
+    else:
+        exception = None
+
+    stacktrace = record.get("stacktrace")
+    if stacktrace is not None:
+        stacktrace = "".join(traceback.format_stack(stacktrace))
+
+    extra = {k: v for k, v in record.items() if k not in _COLUMN_KEYS}
+
+    return (
+        timestamp.timestamp() if timestamp is not None else time.time(),
+        str(level),
+        severity(level),
+        _str_or_none(record.get("msg")),
+        _scalar(record.get("call_module")),
+        _scalar(record.get("call_fn")),
+        _scalar(record.get("call_filename")),
+        _scalar(record.get("call_lineno")),
+        _scalar(record.get("thread_id")),
+        _scalar(record.get("thread_name")),
+        exception,
+        stacktrace,
+        json.dumps(extra, default=str),
+    )
+
+
+def _str_or_none(value: object) -> str | None:
+    return None if value is None else str(value)
+
+
+def _scalar(value: object) -> str | int | float | None:
+    """Values SQLite can store as they are, and anything else as a string"""
+    if value is None or type(value) in (str, int, float):
+        return value  # pyright: ignore[reportReturnType]
+    return str(value)
+
+
+def query(
+    path: str | PathLike[str],
+    *,
+    level: str | None = None,
+    since: datetime.datetime | None = None,
+    until: datetime.datetime | None = None,
+    module: str | None = None,
+    thread_id: int | None = None,
+    limit: int | None = None,
+) -> Iterator[Record]:
+    """Query records from a database written by SQLiteDestination, oldest first.
+
+    - level: only records at least this severe.
+    - since/until: only records logged within this time range.
+    - module: only records whose call_module is this module or one of its submodules.
+    - thread_id: only records from this thread.
+    """
+    clauses: list[str] = []
+    params: list[Any] = []
+
+    if level is not None:
+        clauses.append("severity >= ?")
+        params.append(severity(level))
+    if since is not None:
+        clauses.append("timestamp >= ?")
+        params.append(since.timestamp())
+    if until is not None:
+        clauses.append("timestamp < ?")
+        params.append(until.timestamp())
+    if module is not None:
+        clauses.append("(call_module = ? OR call_module LIKE ? ESCAPE '\\')")
+        params.extend([module, module.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + ".%"])
+    if thread_id is not None:
+        clauses.append("thread_id = ?")
+        params.append(thread_id)
+
+    sql = "SELECT * FROM records"
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    sql += " ORDER BY timestamp, id"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit)
+
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    try:
+        for row in conn.execute(sql, params):
+            yield _row_to_record(row)
+    finally:
+        conn.close()
+
+
+def _row_to_record(row: sqlite3.Row) -> Record:
+    record: Record = {k: row[k] for k in row.keys() if k not in {"id", "severity", "extra"} and row[k] is not None}  # noqa: SIM118
+    record["timestamp"] = datetime.datetime.fromtimestamp(row["timestamp"]).astimezone(None)
+    record.update(json.loads(row["extra"]))
+    return record
+
+
+_DURATION_RE = re.compile(r"^(\d+(?:\.\d+)?)([smhd])$")
+_DURATION_UNITS = dict(s="seconds", m="minutes", h="hours", d="days")
+
+
+def _parse_time(value: str) -> datetime.datetime:
+    """Parse either a relative duration, like 30s, 10m, 2h, or 1d, or an ISO 8601 timestamp"""
+    if match := _DURATION_RE.match(value):
+        amount, unit = match.groups()
+        delta = datetime.timedelta(**{_DURATION_UNITS[unit]: float(amount)})
+        return datetime.datetime.now().astimezone(None) - delta
+
+    timestamp = datetime.datetime.fromisoformat(value)
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.astimezone(None)
+    return timestamp
+
+
+def _format_record(record: Record) -> str:
+    timestamp: datetime.datetime = record.pop("timestamp")
+    level = record.pop("level", "notset")
+    msg = record.pop("msg", "")
+    module = record.pop("call_module", "?")
+    lineno = record.pop("call_lineno", "?")
+    exception = record.pop("exception", None)
+    stacktrace = record.pop("stacktrace", None)
+    extra = {k: v for k, v in record.items() if k not in _COLUMN_KEYS}
+
+    line = f"{timestamp.isoformat(sep=' ', timespec='milliseconds')} {level:<7} {module}:{lineno} {msg}"
+    if extra:
+        line += " " + " ".join(f"{k}={v!r}" for k, v in extra.items())
+
+    return "\n".join(text for text in (line, exception, stacktrace) if text)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Entry point for `python3 -m loglady query`"""
+    parser = argparse.ArgumentParser(prog="python3 -m loglady query", description="Query a loglady SQLite database.")
+    parser.add_argument("path", help="Path to the database")
+    parser.add_argument("--level", help="Only show records at least this severe")
+    parser.add_argument("--since", type=_parse_time, help="Only show records since this time (e.g. 10m, 2h, or ISO)")
+    parser.add_argument("--until", type=_parse_time, help="Only show records before this time (e.g. 10m, 2h, or ISO)")
+    parser.add_argument("--module", help="Only show records from this module and its submodules")
+    parser.add_argument("--thread", type=int, help="Only show records from this thread id")
+    parser.add_argument("--limit", type=int, help="Show at most this many records")
+    args = parser.parse_args(argv)
+
+    for record in query(
+        args.path,
+        level=args.level,
+        since=args.since,
+        until=args.until,
+        module=args.module,
+        thread_id=args.thread,
+        limit=args.limit,
+    ):
+        sys.stdout.write(f"{_format_record(record)}\n")
+
+    return 0
@@ -0,0 +1,202 @@
+# Copyright (c) 2025 Alethea Katherine Flowers.
+# Published under the standard MIT License.
+# Full text available at: https://opensource.org/licenses/MIT
+
+"""Turning individual callsites on and off at runtime.
+
+CallsiteSwitches drops debug records unless the callsite that logged them has
+been switched on. The manager checks them before running any processors, so a
+record from a callsite that's switched off costs next to nothing. Callsites are
+matched by their filename and, optionally, line number:
+
+    switches = CallsiteSwitches()
+    loglady.configure(switches=switches)
+
+    switches.enable("*/db/pool.py")        # every callsite in the file
+    switches.enable("*/db/pool.py:42")     # just one line
+    switches.disable("*/db/pool.py:50")
+
+Switches can also be read from a control file, one rule per line:
+
+    # Debug the connection pool, except for the noisy keepalive.
+    enable */db/pool.py
+    disable */db/pool.py:50
+
+and re-read whenever the process gets a signal, so debug logging can be
+turned on for one function in a live process:
+
+    switches.install_signal_handler("/etc/myapp/callsites", signal.SIGUSR1)
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import signal
+import threading
+from dataclasses import dataclass
+from os import PathLike
+from pathlib import Path
+from types import FrameType
+from typing import override
+from warnings import warn
+
+from .interning import CALLSITES, Callsite, CallsiteRegistry
+from .processors import find_callsite
+from .types import Record
+from .warnings import SwitchesReloadWarning
+
+DEFAULT_LEVELS = frozenset({"debug"})
+
+
+@dataclass(frozen=True, slots=True)
+class _Rule:
+    enabled: bool
+    filename: str
+    lineno: int | None
+
+    @classmethod
+    def parse(cls, pattern: str, *, enabled: bool) -> _Rule:
+        filename, sep, lineno = pattern.rpartition(":")
+        if sep and lineno.isdigit():
+            return cls(enabled, filename, int(lineno))
+        return cls(enabled, pattern, None)
+
+    def matches(self, callsite: Callsite) -> bool:
+        if self.lineno is not None and self.lineno != callsite.lineno:
+            return False
+        return fnmatch.fnmatchcase(callsite.filename, self.filename)
+
+    @override
+    def __str__(self) -> str:
+        pattern = self.filename if self.lineno is None else f"{self.filename}:{self.lineno}"
+        return f"{'enable' if self.enabled else 'disable'} {pattern}"
+
+
+class CallsiteSwitches:
+    """Only lets through debug records from callsites that are switched on.
+
+    Records at any of the given `levels` are dropped unless their callsite has
+    been switched on with enable(), or `default` is True and it hasn't been
+    switched off with disable(). Records at other levels are always let
+    through. When several rules match a callsite, the last one wins.
+
+    The Manager calls allows() for each record before its processors run, so
+    the callsite is found from the logging call's frame rather than from the
+    record's call info. Whether a callsite is switched on is worked out the
+    first time it's seen and then kept in a list indexed by the callsite's ID,
+    so checking a record is a couple of lookups. Changing the rules throws the
+    list away.
+    """
+
+    def __init__(
+        self,
+        *,
+        levels: frozenset[str] = DEFAULT_LEVELS,
+        default: bool = False,
+        callsites: CallsiteRegistry = CALLSITES,
+    ):
+        super().__init__()
+        self.levels = levels
+        self.default = default
+        self.callsites = callsites
+        self._rules: tuple[_Rule, ...] = ()
+        self._states: list[bool | None] = []
+        # Re-entrant, since the signal handler can interrupt the main thread while it's changing the rules.
+        self._lock = threading.RLock()
+
+    def allows(self, record: Record) -> bool:
+        """Whether the record should be logged. This must be called from within the logging call."""
+        if record.get("level") not in self.levels:
+            return True
+
+        callsite = find_callsite(self.callsites)
+
+        states = self._states
+        if callsite.id < len(states) and (enabled := states[callsite.id]) is not None:
+            return enabled
+
+        return self._resolve(states, callsite)
+
+    @property
+    def rules(self) -> list[str]:
+        """The current rules, in the same format as the control file."""
+        return [str(rule) for rule in self._rules]
+
+    def enable(self, pattern: str) -> None:
+        """Switch on the callsites matching the pattern, a filename glob optionally followed by `:lineno`."""
+        self._add_rule(_Rule.parse(pattern, enabled=True))
+
+    def disable(self, pattern: str) -> None:
+        """Switch off the callsites matching the pattern, a filename glob optionally followed by `:lineno`."""
+        self._add_rule(_Rule.parse(pattern, enabled=False))
+
+    def reset(self) -> None:
+        """Remove all rules, so every callsite goes back to the default."""
+        self._set_rules(())
+
+    def load(self, path: str | PathLike[str]) -> None:
+        """Replace the rules with those in the given control file.
+
+        Each line is either `enable <pattern>` or `disable <pattern>`. Blank
+        lines and lines starting with # are ignored. A missing file means no
+        rules.
+        """
+        try:
+            text = Path(path).read_text()
+        except FileNotFoundError:
+            text = ""
+
+        rules: list[_Rule] = []
+        for n, raw_line in enumerate(text.splitlines(), start=1):
+            line = raw_line.strip()
+            if not line or line.startswith("#"):
+                continue
+
+            action, _, pattern = line.partition(" ")
+            pattern = pattern.strip()
+            if action not in ("enable", "disable") or not pattern:
+                msg = f"{path}:{n}: expected 'enable <pattern>' or 'disable <pattern>', got {line!r}"
+                raise ValueError(msg)
+
+            rules.append(_Rule.parse(pattern, enabled=action == "enable"))
+
+        self._set_rules(tuple(rules))
+
+    def install_signal_handler(self, path: str | PathLike[str], signum: int | None = None) -> None:
+        """Load the control file now and again every time the process receives the given signal, SIGUSR1 by default.
+
+        Like all signal handlers, this must be called from the main thread. If
+        the file can't be read or has a bad rule when the signal arrives, a
+        SwitchesReloadWarning is issued and the current rules are kept.
+        """
+        self.load(path)
+
+        def reload_switches(_signum: int, _frame: FrameType | None) -> None:
+            try:
+                self.load(path)
+            except Exception as err:  # noqa: BLE001
+                warn(SwitchesReloadWarning(path=path, error=err), stacklevel=1)
+
+        _ = signal.signal(signal.SIGUSR1 if signum is None else signum, reload_switches)
+
+    def _add_rule(self, rule: _Rule) -> None:
+        with self._lock:
+            self._set_rules((*self._rules, rule))
+
+    def _set_rules(self, rules: tuple[_Rule, ...]) -> None:
+        with self._lock:
+            self._rules = rules
+            # Replace the list rather than clearing it, so that a record that's being checked concurrently can only
+            # ever store its result in the old list.
+            self._states = []
+
+    def _resolve(self, states: list[bool | None], callsite: Callsite) -> bool:
+        enabled = self.default
+        for rule in self._rules:
+            if rule.matches(callsite):
+                enabled = rule.enabled
+
+        if callsite.id >= len(states):
+            states.extend([None] * (callsite.id + 1 - len(states)))
+        states[callsite.id] = enabled
+        return enabled
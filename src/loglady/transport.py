@@ -4,18 +4,27 @@
 
 import queue
 import threading
+import time
 from collections.abc import Generator, Iterable
 from dataclasses import dataclass, field
 from typing import ClassVar, Protocol, override
 from warnings import warn
 
 from .destination import Destination, DestinationList
+from .routing import RoutingTable
 from .types import Record
 from .warnings import BackgroundThreadWarning, DestinationErrorWarning, UndeliveredLogsWarning
 
 
 class Transport(Protocol):
-    """Transports are responsible for relaying records to a list of destinations"""
+    """Transports are responsible for relaying records to a list of destinations
+
+    Destinations wrapped in a FilteredDestination are only handed the records
+    they want. The built-in transports compile their destinations into a
+    RoutingTable, which is rebuilt whenever `destinations` is reassigned or
+    replaced. If the list of destinations is changed in place, call their
+    invalidate_routes() so that it's rebuilt.
+    """
 
     destinations: Destination | DestinationList
 
@@ -24,6 +33,51 @@ class Transport(Protocol):
     def shutdown(self) -> None:
         pass
 
+    def replace_destinations(self, destinations: Destination | DestinationList) -> None:
+        """Swap in new destinations without losing or duplicating any records.
+
+        Records relayed before this is called are delivered to the old
+        destinations and records relayed after it returns are delivered to the
+        new ones. The old destinations are flushed.
+        """
+        old = self.destinations
+        self.destinations = destinations
+        for dest in _iter_destinations(old):
+            dest.flush()
+
+
+class _RoutingCache:
+    """Holds the RoutingTable for a transport's destinations, recompiling it when the destinations are replaced or
+    the cache is invalidated."""
+
+    def __init__(self):
+        super().__init__()
+        self._destinations: Destination | DestinationList | None = None
+        self._table: RoutingTable | None = None
+
+    def get(self, destinations: Destination | DestinationList) -> RoutingTable:
+        # This runs for every record, so it only notices destinations being replaced. Changes made in place have to
+        # call invalidate().
+        table = self._table
+        if table is None or destinations is not self._destinations:
+            table = self._table = RoutingTable(tuple(_iter_destinations(destinations)))
+            self._destinations = destinations
+        return table
+
+    def invalidate(self) -> None:
+        self._table = None
+
+
+class _Control:
+    """Something other than a record that's put into ThreadedTransport's queue."""
+
+
+class _ReplaceDestinations(_Control):
+    def __init__(self, destinations: Destination | DestinationList):
+        super().__init__()
+        self.destinations = destinations
+        self.done = threading.Event()
+
 
 @dataclass(slots=True)
 class SyncTransport(Transport):
@@ -33,32 +87,50 @@ class SyncTransport(Transport):
     """
 
     destinations: Destination | DestinationList = field(default_factory=list)
+    _routing: _RoutingCache = field(init=False, default_factory=_RoutingCache)
 
     @override
     def relay(self, record: Record) -> None:
-        for dest in _iter_destinations(self.destinations):
-            dest(record)
+        for record_filter, dest in self._routing.get(self.destinations).routes(record):
+            if record_filter is None or record_filter.matches_fields(record):
+                dest(record)
+
+    @override
+    def replace_destinations(self, destinations: Destination | DestinationList) -> None:
+        Transport.replace_destinations(self, destinations)
+        self._routing.invalidate()
 
     @override
     def flush(self) -> None:
         for dest in _iter_destinations(self.destinations):
             dest.flush()
 
+    def invalidate_routes(self) -> None:
+        """Rebuild the routing table for the next record. Call this after changing `destinations` in place."""
+        self._routing.invalidate()
+
 
 @dataclass(slots=True)
 class ThreadedTransport(Transport):
     """A transport that handles relaying in a separate thread.
 
     This prevents logging calls from blocking, as they only need to queue the record.
+
+    The thread drains everything that's waiting in the queue, up to
+    `max_batch_size` records, and hands it to each destination's batch() in
+    one go.
     """
 
-    _STOP: ClassVar = object()
-    _FLUSH: ClassVar = object()
+    _STOP: ClassVar = _Control()
+    _FLUSH: ClassVar = _Control()
 
     destinations: Destination | DestinationList = field(default_factory=list)
+    max_batch_size: int = 1000
 
+    _routing: _RoutingCache = field(init=False, default_factory=_RoutingCache)
     _q: queue.SimpleQueue = field(init=False, default_factory=queue.SimpleQueue)
     _thread: threading.Thread | None = field(init=False, default=None)
+    _stopping: bool = field(init=False, default=False)
     _flush_cond: threading.Condition = field(init=False, default_factory=threading.Condition)
 
     @override
@@ -75,9 +147,11 @@ class ThreadedTransport(Transport):
         if self._thread is None:
             return
 
+        self._stopping = True
         self._q.put(self._STOP)
         self._thread.join()
         self._thread = None
+        self._stopping = False
 
         if not self._q.empty():
             warn(
@@ -85,6 +159,46 @@ class ThreadedTransport(Transport):
                 stacklevel=1,
             )
 
+    @override
+    def replace_destinations(
+        self, destinations: Destination | DestinationList, *, timeout: float | None = 10.0
+    ) -> None:
+        """Swap in new destinations without losing or duplicating any records.
+
+        The swap goes through the queue, so that the thread delivers everything
+        queued before it to the old destinations and everything after it to
+        the new ones. This waits up to `timeout` seconds for the thread to
+        reach the swap and flush the old destinations. If it takes longer, the
+        swap still happens in order, just after this returns. Called from one
+        of the destinations, on the thread itself, this doesn't wait at all.
+        """
+        thread = self._thread
+
+        if thread is not None and self._stopping:
+            # Anything queued after the stop would never be delivered, so let the thread finish up first.
+            thread.join(timeout)
+
+        if thread is None or not thread.is_alive():
+            Transport.replace_destinations(self, destinations)
+            self._routing.invalidate()
+            return
+
+        swap = _ReplaceDestinations(destinations)
+        self._q.put(swap)
+
+        if threading.current_thread() is thread:
+            return
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not swap.done.wait(0.1):
+            if not thread.is_alive():
+                # The thread died or was stopped before it got to the swap, so nothing else will make it.
+                if not swap.done.is_set():
+                    self._replace_destinations(swap)
+                return
+            if deadline is not None and time.monotonic() >= deadline:
+                return
+
     @override
     def flush(self):
         if self._thread is None:
@@ -98,19 +212,29 @@ class ThreadedTransport(Transport):
         for destination in _iter_destinations(self.destinations):
             destination.flush()
 
+    def invalidate_routes(self) -> None:
+        """Rebuild the routing table for the next record. Call this after changing `destinations` in place."""
+        self._routing.invalidate()
+
     def _thread_main(self):
         while True:
             try:
-                record = self._q.get(block=True)
-                if record is self._STOP:
+                batch, control = self._drain()
+
+                if len(batch) == 1:
+                    self._deliver(batch[0])
+                elif batch:
+                    self._deliver_batch(batch)
+
+                if control is self._STOP:
                     break
 
-                if record is self._FLUSH:
+                if control is self._FLUSH:
                     with self._flush_cond:
                         self._flush_cond.notify_all()
-                    continue
 
-                self._deliver(record)
+                if isinstance(control, _ReplaceDestinations):
+                    self._replace_destinations(control)
 
             except queue.Empty:
                 break
@@ -122,10 +246,73 @@ class ThreadedTransport(Transport):
                 )
                 raise
 
+    def _drain(self) -> tuple[list[Record], object | None]:
+        """Block until something is queued, then take everything that's queued up until a control item.
+
+        Returns the records and the control item (_STOP, _FLUSH, or a _ReplaceDestinations) that ended the batch, if
+        any.
+        """
+        batch: list[Record] = []
+        item = self._q.get(block=True)
+
+        while not isinstance(item, _Control):
+            batch.append(item)
+            if len(batch) >= self.max_batch_size:
+                return batch, None
+            try:
+                item = self._q.get_nowait()
+            except queue.Empty:
+                return batch, None
+
+        return batch, item
+
+    def _replace_destinations(self, swap: _ReplaceDestinations):
+        old = self.destinations
+        self.destinations = swap.destinations
+        self._routing.invalidate()
+        swap.done.set()
+
+        for dest in _iter_destinations(old):
+            try:
+                dest.flush()
+            except Exception as err:  # noqa: BLE001
+                warn(DestinationErrorWarning(destination=dest, error=err), stacklevel=1)
+
+    def _deliver_batch(self, batch: list[Record]):
+        table = self._routing.get(self.destinations)
+
+        # Records only go to destinations that want them, so each destination gets its own slice of the batch.
+        per_destination: dict[int, tuple[Destination, list[Record]]] = {}
+        for record in batch:
+            for record_filter, dest in table.routes(record):
+                if record_filter is None or record_filter.matches_fields(record):
+                    if (entry := per_destination.get(id(dest))) is None:
+                        entry = per_destination[id(dest)] = (dest, [])
+                    entry[1].append(record)
+
+        for dest, records in per_destination.values():
+            if (batch_fn := getattr(dest, "batch", None)) is None:
+                for record in records:
+                    self._deliver_one(dest, record)
+                continue
+
+            # Destination.batch() skips records that fail on their own, so this only catches bulk writes that fail.
+            try:
+                batch_fn(records)
+            except Exception as err:  # noqa: BLE001
+                warn(DestinationErrorWarning(destination=dest, error=err), stacklevel=1)
+
+    def _deliver_one(self, dest: Destination, record: Record):
+        try:
+            dest(record)
+        except Exception as err:  # noqa: BLE001
+            warn(DestinationErrorWarning(destination=dest, error=err), stacklevel=1)
+
     def _deliver(self, record: Record):
-        for dest in _iter_destinations(self.destinations):
+        for record_filter, dest in self._routing.get(self.destinations).routes(record):
             try:
-                dest(record)
+                if record_filter is None or record_filter.matches_fields(record):
+                    dest(record)
             except Exception as err:  # noqa: BLE001
                 warn(DestinationErrorWarning(destination=dest, error=err), stacklevel=1)
 
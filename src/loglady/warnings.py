@@ -36,3 +36,35 @@ class DestinationErrorWarning(LogladyWarning):
 
     def __init__(self, *, destination: Any, error: Exception) -> None:
         super().__init__(f"error in background thread while delivering log to destination {destination!r}: {error!r}")
+
+
+class FallbackBufferWarning(LogladyWarning):
+    """Warning for when records buffered before loglady.configure() can't be read back from disk."""
+
+    def __init__(self, *, error: Exception) -> None:
+        super().__init__(f"error reading records buffered before loglady.configure(), some were lost: {error!r}")
+
+
+class SwitchesReloadWarning(LogladyWarning):
+    """Warning for when callsite switches can't be reloaded from their control file and the current rules are kept."""
+
+    def __init__(self, *, path: Any, error: Exception) -> None:
+        super().__init__(f"error reloading callsite switches from {path}, keeping the current rules: {error!r}")
+
+
+class RenderPoolWarning(LogladyWarning):
+    """Warning for when a worker process fails to render something and it's rendered in-process instead."""
+
+    def __init__(self, *, renderable: Any, error: Exception) -> None:
+        super().__init__(
+            f"error rendering {type(renderable).__name__} in worker process, rendering in-process: {error!r}"
+        )
+
+
+class CaptureRenderWarning(LogladyWarning):
+    """Warning for when worker processes fail to format captured logs and they're formatted in-process instead."""
+
+    def __init__(self, *, captures: int, error: Exception) -> None:
+        super().__init__(
+            f"error formatting {captures} captured logs in worker processes, formatting them in-process: {error!r}"
+        )
@@ -0,0 +1,229 @@
+# Copyright (c) 2025 Alethea Katherine Flowers.
+# Published under the standard MIT License.
+# Full text available at: https://opensource.org/licenses/MIT
+
+import datetime
+import io
+import sys
+
+import pytest
+
+from loglady import CaptureDestination, FlightRecorderDestination
+from loglady.destination import LogfmtFormatter, TemplateFormatter, TextIODestination
+from loglady.errors import InvalidTemplateError
+from loglady.warnings import DestinationErrorWarning
+
+
+def test_flight_recorder_dumps_on_error():
+    capture = CaptureDestination()
+    recorder = FlightRecorderDestination(destination=capture, capacity=3)
+
+    for n in range(5):
+        recorder(dict(msg=f"debug {n}", level="debug"))
+
+    assert len(capture.records) == 0
+    assert len(recorder) == 3
+
+    recorder(dict(msg="oh no", level="error"))
+
+    assert [r["msg"] for r in capture.records] == ["debug 3", "debug 4", "oh no"]
+    assert len(recorder) == 0
+    assert recorder.dumps == 1
+
+
+def test_flight_recorder_keeps_copies():
+    capture = CaptureDestination()
+    recorder = FlightRecorderDestination(destination=capture)
+
+    record = dict(msg="hello", level="info")
+    recorder(record)
+    record.pop("msg")
+    recorder.dump()
+
+    assert capture.records[0] == dict(msg="hello", level="info")
+
+
+def test_flight_recorder_byte_limit():
+    capture = CaptureDestination()
+    recorder = FlightRecorderDestination(destination=capture, capacity=100, max_bytes=2000)
+
+    for n in range(100):
+        recorder(dict(msg=f"debug {n}", level="debug"))
+
+    assert 0 < len(recorder) < 100
+    assert list(recorder)[-1]["msg"] == "debug 99"
+
+
+def test_capture_find_and_count_by():
+    capture = CaptureDestination()
+
+    capture(dict(msg="a", level="info", call_module="web", user_id=1))
+    capture(dict(msg="b", level="error", call_module="db", user_id=1))
+    capture(dict(msg="c", level="error", call_module="web", user_id=2))
+    capture(dict(msg="d", level="debug", call_module="db"))
+
+    assert [r["msg"] for r in capture.find(level="error")] == ["b", "c"]
+    assert [r["msg"] for r in capture.find(level="error", user_id=1)] == ["b"]
+    assert [r["msg"] for r in capture.find(call_module="db")] == ["b", "d"]
+    assert capture.find(level="warning") == []
+    assert capture.count_by("level") == dict(info=1, error=2, debug=1)
+    assert capture.count_by("user_id") == {1: 2, 2: 1}
+
+
+def test_capture_indexes_survive_records_being_modified():
+    capture = CaptureDestination()
+    record = dict(msg="a", level="error", call_module="db")
+    capture(record)
+
+    # Downstream formatters pop fields from the same record dict.
+    del record["level"], record["call_module"]
+
+    assert capture.find(level="error", call_module="db") == [record]
+    assert capture.count_by("level") == dict(error=1)
+
+
+def test_capture_limits_keep_indexes_in_sync():
+    capture = CaptureDestination(limit=2)
+
+    capture(dict(msg="a", level="error"))
+    capture(dict(msg="b", level="info"))
+    capture(dict(msg="c", level="error"))
+
+    assert [r["msg"] for r in capture.records] == ["b", "c"]
+    assert capture.discarded_records == 1
+    assert [r["msg"] for r in capture.find(level="error")] == ["c"]
+    assert capture.count_by("msg") == dict(b=1, c=1)
+
+    # Once the key index has been built it's kept up to date as records come and go.
+    capture(dict(msg="d", level="info", user_id=1))
+    capture(dict(msg="e", level="info"))
+    assert [r["msg"] for r in capture.find(user_id=1)] == ["d"]
+    assert capture.count_by("msg") == dict(d=1, e=1)
+    capture(dict(msg="f", level="info"))
+    assert capture.find(user_id=1) == []
+    assert capture.count_by("user_id") == {}
+
+    capture.reset()
+    assert len(capture.records) == 0
+    assert capture.count_by("level") == {}
+
+
+def test_capture_byte_limit():
+    capture = CaptureDestination(max_bytes=2000)
+
+    for n in range(100):
+        capture(dict(msg=f"record {n}", level="info"))
+
+    assert 0 < len(capture.records) < 100
+    assert capture.discarded_records == 100 - len(capture.records)
+    assert capture.records[-1]["msg"] == "record 99"
+    assert len(capture.find(level="info")) == len(capture.records)
+
+
+def test_template_formatter():
+    formatter = TemplateFormatter("{timestamp:%H:%M:%S} {level:>7} {msg!r} {extra}")
+    timestamp = datetime.datetime(2024, 3, 15, 12, 30, 5, 250)  # noqa: DTZ001
+    record = dict(timestamp=timestamp, level="info", msg="hello", user=1, name="thea")
+
+    assert formatter(record) == "12:30:05    info 'hello' user=1 name='thea'\n"
+    # The record isn't modified.
+    assert record == dict(timestamp=timestamp, level="info", msg="hello", user=1, name="thea")
+    # Missing fields are empty but still padded.
+    assert formatter(dict(msg="hi")) == "         'hi' \n"
+
+
+def test_template_formatter_timestamps_by_second():
+    formatter = TemplateFormatter("{timestamp:%d %H:%M:%S}")
+    timestamp = datetime.datetime(2024, 3, 15, 12, 30, 5, 250)  # noqa: DTZ001
+
+    assert formatter(dict(timestamp=timestamp)) == "15 12:30:05\n"
+    assert formatter(dict(timestamp=timestamp.replace(microsecond=999))) == "15 12:30:05\n"
+    assert formatter(dict(timestamp=timestamp.replace(second=6))) == "15 12:30:06\n"
+    assert formatter(dict(timestamp=timestamp.replace(day=16))) == "16 12:30:05\n"
+
+    formatter = TemplateFormatter("{timestamp:%S.%f}")
+    assert formatter(dict(timestamp=timestamp)) == "05.000250\n"
+    assert formatter(dict(timestamp=timestamp.replace(microsecond=999))) == "05.000999\n"
+
+
+def test_template_formatter_conversions_with_specs():
+    template = "{count!s:>4}|{count!r:>4}|{count:<4}|{ratio!s:.3}|{ratio:.3}"
+    formatter = TemplateFormatter(template)
+
+    for record in [dict(count=7, ratio=0.12345), dict(count="7", ratio="0.12345")]:
+        assert formatter(record) == template.format(**record) + "\n"
+    assert formatter(dict(count=7, ratio=0.12345)) == "   7|   7|7   |0.1|0.123\n"
+
+
+@pytest.mark.parametrize("template", ["{timestamp.year}", "{}", "{msg:{width}}", "{msg", "{msg!x}"])
+def test_template_formatter_invalid(template):
+    with pytest.raises(InvalidTemplateError):
+        TemplateFormatter(template)
+
+
+def test_logfmt_formatter():
+    formatter = LogfmtFormatter()
+    timestamp = datetime.datetime(2024, 3, 15, 12, 30, 5, 250, tzinfo=datetime.UTC)
+    record = dict(
+        user="thea",
+        msg="hello world",
+        level="info",
+        timestamp=timestamp,
+        count=3,
+        ratio=0.5,
+        ok=True,
+        missing=None,
+        path="/srv/app",
+        quoted='say "hi"\nbye',
+        empty="",
+    )
+
+    assert formatter(record) == (
+        'timestamp=2024-03-15T12:30:05.000250+00:00 level=info msg="hello world" user=thea count=3 ratio=0.5'
+        ' ok=true missing= path=/srv/app quoted="say \\"hi\\"\\nbye" empty=""\n'
+    )
+    # Timestamps within the same second reuse the formatted date and time.
+    assert formatter(dict(timestamp=timestamp.replace(microsecond=7))) == "timestamp=2024-03-15T12:30:05.000007+00:00\n"
+    assert formatter(dict(timestamp=timestamp.replace(second=6))) == "timestamp=2024-03-15T12:30:06.000250+00:00\n"
+
+
+def test_logfmt_formatter_keys_and_exceptions():
+    formatter = LogfmtFormatter()
+
+    try:
+        raise ValueError("oops")  # noqa: EM101, TRY301
+    except ValueError:
+        record = dict(msg="failed", exception=sys.exc_info(), **{"odd key=": 1})
+
+    assert formatter(record) == 'msg=failed exception="ValueError: oops" odd_key_=1\n'
+    assert formatter(dict(msg="ok", exception=(None, None, None))) == "msg=ok\n"
+
+
+def test_logfmt_formatter_stacktrace():
+    frame = sys._getframe()  # pyright: ignore[reportPrivateUsage]
+
+    line = LogfmtFormatter()(dict(msg="here", stacktrace=frame))
+
+    assert line.startswith('msg=here stacktrace="  File ')
+    assert "in test_logfmt_formatter_stacktrace\\n" in line
+    assert "<frame" not in line
+
+
+def test_logfmt_formatter_batch():
+    out = io.StringIO()
+    dest = TextIODestination(io=out, formatter=LogfmtFormatter())
+
+    dest.batch([dict(msg="one"), dict(msg="two", n=2)])
+
+    assert out.getvalue() == "msg=one\nmsg=two n=2\n"
+
+
+def test_text_io_batch_skips_records_that_fail_to_format():
+    out = io.StringIO()
+    dest = TextIODestination(io=out)
+
+    # PlainFormatter needs a message.
+    with pytest.warns(DestinationErrorWarning):
+        dest.batch([dict(msg="one", level="info"), dict(level="info"), dict(msg="three", level="info")])
+
+    assert out.getvalue() == "info: one record={'level': 'info'}\ninfo: three record={'level': 'info'}\n"
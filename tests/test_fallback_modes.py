@@ -4,6 +4,16 @@
 
 import subprocess
 import sys
+import threading
+from typing import override
+
+import pytest
+
+from loglady import Destination, Record
+from loglady._fallback import Fallback
+from loglady.manager import Manager
+from loglady.transport import SyncTransport
+from loglady.warnings import FallbackBufferWarning
 
 
 def test_default_fallback_mode():
@@ -80,3 +90,78 @@ def test_buffer_and_exit_without_configure():
         env=dict(LOGLADY_FALLBACK_MODE="buffer"),
     )
     assert "NotConfiguredWarning" in result.stderr
+
+
+class _StubDestination(Destination):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    @override
+    def __call__(self, record: Record):
+        self.records.append(record)
+
+
+def test_fallback_buffer_spills_to_disk():
+    fallback = Fallback(mode="buffer", buffer_limit=10, buffer_max_spill_bytes=10_000)
+    buffer = fallback._capture_destination  # pyright: ignore[reportPrivateUsage]
+
+    try:
+        raise ValueError("oops")  # noqa: EM101, TRY301
+    except ValueError:
+        exc_info = sys.exc_info()
+
+    for n in range(1000):
+        fallback.manager.relay(dict(n=n, msg=f"record {n}", exception=exc_info if n == 20 else None))
+
+    # Only the first records are kept in memory, the rest are spilled until the file is full.
+    assert len(buffer.records) == 10
+    assert buffer.spilled_records > 0
+    assert buffer.discarded_records > 0
+    assert len(buffer.records) + buffer.spilled_records + buffer.discarded_records == 1000
+
+    kept = len(buffer.records) + buffer.spilled_records
+    dest = _StubDestination()
+    fallback.drain_to_new_manager(Manager(transport=SyncTransport(dest), processors=[]))
+
+    # Records are drained in order, including ones that can't be pickled, followed by a note about the discarded ones.
+    assert [r["n"] for r in dest.records[:-1]] == list(range(kept))
+    assert dest.records[20]["exception"] is exc_info
+    assert "were discarded" in dest.records[-1]["msg"]
+    assert len(buffer) == 0
+
+
+def test_fallback_buffer_bounds_unpicklable_records():
+    fallback = Fallback(mode="buffer", buffer_limit=10, buffer_max_bytes=20_000)
+    buffer = fallback._capture_destination  # pyright: ignore[reportPrivateUsage]
+
+    for n in range(1000):
+        fallback.manager.relay(dict(n=n, lock=threading.Lock()))
+
+    # Records that can't be spilled are held in memory, but only up to the memory limit.
+    assert buffer.spilled_records < 1000 - 10
+    assert buffer.discarded_records > 0
+    assert buffer._bytes <= 20_000  # pyright: ignore[reportPrivateUsage]
+    assert len(buffer) == 1000
+
+
+def test_fallback_buffer_drain_survives_a_bad_spill_file():
+    fallback = Fallback(mode="buffer", buffer_limit=1)
+    buffer = fallback._capture_destination  # pyright: ignore[reportPrivateUsage]
+    lock = threading.Lock()
+
+    fallback.manager.relay(dict(n=0))
+    fallback.manager.relay(dict(n=1))
+    fallback.manager.relay(dict(n=2, lock=lock))
+    # Clobber the spilled records, leaving the held one's position intact.
+    spill = buffer._spill  # pyright: ignore[reportPrivateUsage]
+    assert spill is not None
+    _ = spill.seek(0)
+    _ = spill.write(b"\x00")
+
+    dest = _StubDestination()
+    with pytest.warns(FallbackBufferWarning):
+        fallback.drain_to_new_manager(Manager(transport=SyncTransport(dest), processors=[]))
+
+    assert [r["n"] for r in dest.records] == [0, 2]
+    assert dest.records[1]["lock"] is lock
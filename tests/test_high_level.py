@@ -2,10 +2,15 @@
 # Published under the standard MIT License.
 # Full text available at: https://opensource.org/licenses/MIT
 
+import subprocess
+import sys
+import textwrap
+import threading
+import time
 from typing import override
 
 import loglady
-from loglady import Destination, Record
+from loglady import Destination, Manager, Record, SyncTransport, ThreadedTransport, add_call_info, manager_stack
 
 from .utils import assert_dict_subset
 
@@ -61,3 +66,205 @@ def test_configure_and_magics():
             thread_name=...,
         ),
     )
+
+
+def test_magics_follow_the_manager_stack():
+    first, second = StubDestination(), StubDestination()
+
+    with manager_stack.rewind():
+        manager_stack.push(Manager(transport=SyncTransport(first), processors=[add_call_info]))
+        held = loglady.logger()
+
+        # Without context, the magics and logger() all share the one logger rather than creating a new one per call.
+        assert held is loglady.logger()
+        assert loglady.info.__self__ is held
+
+        loglady.info("one")
+        manager_stack.push(Manager(transport=SyncTransport(second), processors=[add_call_info]))
+        loglady.info("two")
+        held.info("three")
+
+    assert [r["msg"] for r in first.records] == ["one"]
+    assert [r["msg"] for r in second.records] == ["two", "three"]
+    assert {r["call_fn"] for r in first.records + second.records} == {"test_magics_follow_the_manager_stack"}
+
+
+def test_named_magic_loggers():
+    dest = StubDestination()
+
+    with manager_stack.rewind():
+        mgr = loglady.configure(destinations=[dest], levels={"db": "warning"}, install_hook=False)
+        db = loglady.logger(name="db.pool")
+
+        db.info("dropped")
+        db.warning("kept")
+        mgr.levels.set("db.pool", "info")
+        db.info("kept too")
+        mgr.flush()
+
+    assert [r["msg"] for r in dest.records] == ["kept", "kept too"]
+
+
+def test_isolated_manager_stacks():
+    outer = StubDestination()
+    destinations = [StubDestination() for _ in range(4)]
+    barrier = threading.Barrier(len(destinations))
+
+    def worker(n: int):
+        with manager_stack.isolated():
+            manager_stack.push(Manager(transport=SyncTransport(destinations[n]), processors=[]))
+            # Every thread has pushed its own manager before any of them log.
+            barrier.wait()
+            loglady.info(f"from {n}")
+            assert manager_stack.pop() is not None
+            assert manager_stack.pop() is None
+
+    with manager_stack.rewind():
+        manager_stack.push(Manager(transport=SyncTransport(outer), processors=[]))
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(len(destinations))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        with manager_stack.isolated():
+            inner = StubDestination()
+            with manager_stack.rewind():
+                manager_stack.push(Manager(transport=SyncTransport(inner), processors=[]))
+                loglady.info("isolated")
+            loglady.info("not isolated")
+
+        loglady.info("outer")
+
+    assert [[r["msg"] for r in dest.records] for dest in destinations] == [[f"from {n}"] for n in range(4)]
+    assert [r["msg"] for r in inner.records] == ["isolated"]
+    assert [r["msg"] for r in outer.records] == ["not isolated", "outer"]
+
+
+def test_isolated_rewind_restores_popped_managers():
+    first, second = StubDestination(), StubDestination()
+
+    with manager_stack.isolated():
+        manager_stack.push(Manager(transport=SyncTransport(first), processors=[]))
+
+        with manager_stack.rewind():
+            # Pops the manager that was there before the rewind, and replaces it.
+            assert manager_stack.pop() is not None
+            manager_stack.push(Manager(transport=SyncTransport(second), processors=[]))
+            loglady.info("replaced")
+
+        loglady.info("restored")
+
+    assert [r["msg"] for r in first.records] == ["restored"]
+    assert [r["msg"] for r in second.records] == ["replaced"]
+
+
+def test_manager_reconfigure():
+    old, new = StubDestination(), StubDestination()
+
+    with manager_stack.rewind():
+        mgr = loglady.configure(destinations=[old], install_hook=False)
+        thread = mgr.transport._thread  # pyright: ignore[reportAttributeAccessIssue]
+
+        loglady.info("before")
+        mgr.reconfigure(
+            processors=[*mgr.processors, lambda record: {**record, "tagged": True}],
+            destinations=[new],
+        )
+        loglady.info("after")
+        mgr.flush()
+
+        # The transport and its thread are kept.
+        assert mgr.transport._thread is thread  # pyright: ignore[reportAttributeAccessIssue]
+
+    assert [r["msg"] for r in old.records] == ["before"]
+    assert "tagged" not in old.records[0]
+    assert [r["msg"] for r in new.records] == ["after"]
+    assert new.records[0]["tagged"] is True
+
+
+def test_manager_reconfigure_under_load():
+    old, new = StubDestination(), StubDestination()
+    mgr = Manager(transport=ThreadedTransport(destinations=[old]), processors=[lambda record: {**record, "gen": "old"}])
+    mgr.transport.start()  # pyright: ignore[reportAttributeAccessIssue]
+
+    relayed = [0] * 4
+    started, stop = threading.Event(), threading.Event()
+
+    def produce(producer: int):
+        while not stop.is_set():
+            mgr.relay(dict(producer=producer, n=relayed[producer]))
+            relayed[producer] += 1
+            if relayed[producer] == 1000:
+                started.set()
+
+    producers = [threading.Thread(target=produce, args=(p,)) for p in range(4)]
+    for producer in producers:
+        producer.start()
+    _ = started.wait()
+
+    mgr.reconfigure(processors=[lambda record: {**record, "gen": "new"}], destinations=[new])
+    # Each producer might be part-way through relaying a record, but the ones after that start after the swap.
+    after_swap = [n + 1 for n in relayed]
+    # Keep going for a bit so that the new processors see some records too.
+    before = sum(relayed)
+    while sum(relayed) < before + 1000:
+        time.sleep(0.001)
+    stop.set()
+
+    for producer in producers:
+        producer.join()
+    mgr.shutdown()
+
+    # No record went through the new processors to the old destinations, and every record was delivered exactly once.
+    assert {r["gen"] for r in old.records} == {"old"}
+    assert all(r["gen"] == "new" for r in new.records if r["n"] >= after_swap[r["producer"]])
+    delivered = sorted((r["producer"], r["n"]) for r in old.records + new.records)
+    assert delivered == [(p, n) for p in range(4) for n in range(relayed[p])]
+
+
+class MinimalTransport:
+    """A transport that only has what the Transport protocol requires."""
+
+    def __init__(self, destinations: list[Destination]):
+        super().__init__()
+        self.destinations = destinations
+
+    def relay(self, record: Record) -> None:
+        for dest in self.destinations:
+            dest(record)
+
+    def flush(self) -> None:
+        pass
+
+
+def test_manager_reconfigure_structural_transport():
+    old, new = StubDestination(), StubDestination()
+    # It doesn't have replace_destinations(), which is the point.
+    mgr = Manager(transport=MinimalTransport([old]), processors=[])  # pyright: ignore[reportArgumentType]
+
+    mgr.relay(dict(msg="before"))
+    mgr.reconfigure(destinations=[new])
+    mgr.relay(dict(msg="after"))
+
+    assert old.records == [dict(msg="before")]
+    assert new.records == [dict(msg="after")]
+
+
+def test_import_does_not_load_rich_or_sqlite():
+    # Importing Rich and Pygments more than doubles the time it takes to import loglady, so they should only be
+    # imported once something needs the console destination.
+    script = textwrap.dedent(
+        """
+        import sys
+        import loglady
+
+        assert not [m for m in sys.modules if m.split(".")[0] in ("rich", "pygments", "sqlite3", "argparse", "pickle")]
+        assert loglady.RichConsoleDestination.__module__ == "loglady.rich.destination"
+        assert "rich" in sys.modules
+        assert loglady.SQLiteDestination.__module__ == "loglady.sqlite"
+        assert "sqlite3" in sys.modules
+        """
+    )
+    subprocess.run([sys.executable, "-c", script], check=True)
@@ -0,0 +1,70 @@
+# Copyright (c) 2025 Alethea Katherine Flowers.
+# Published under the standard MIT License.
+# Full text available at: https://opensource.org/licenses/MIT
+
+import json
+import sys
+
+import loglady.processors
+from loglady.destination import CompactJSONFormatter
+from loglady.interning import CALLSITES, CallsiteRegistry, MessageRegistry
+
+
+def test_callsite_registry():
+    registry = CallsiteRegistry()
+
+    def callsite():
+        return registry.register(sys._getframe())  # pyright: ignore[reportPrivateUsage]
+
+    first = callsite()
+    second = callsite()
+    other = registry.register(sys._getframe())  # pyright: ignore[reportPrivateUsage]
+
+    assert first is second
+    assert first.id != other.id
+    assert first.fn == "test_callsite_registry.<locals>.callsite"
+    assert first.module == __name__
+    assert registry[other.id] is other
+    assert len(registry) == 2
+
+
+def test_message_registry_limit():
+    registry = MessageRegistry(limit=2)
+
+    assert registry.register("one") == 0
+    assert registry.register("two") == 1
+    assert registry.register("one") == 0
+    assert registry.register("three") is None
+    assert registry.register(42) is None
+    assert registry[1] == "two"
+
+
+def test_add_call_info_registers_callsite():
+    first = loglady.processors.add_call_info(dict())
+    second = loglady.processors.add_call_info(dict())
+
+    # The ID only means something in this process, so it's kept out of the record.
+    assert "call_id" not in first
+    first_callsite = CALLSITES.lookup(first["call_filename"], first["call_fn"], first["call_lineno"])
+    second_callsite = CALLSITES.lookup(second["call_filename"], second["call_fn"], second["call_lineno"])
+    assert first_callsite is not None
+    assert second_callsite is not None
+    assert first_callsite.id != second_callsite.id
+    assert CALLSITES[first_callsite.id] is first_callsite
+
+
+def test_compact_json_formatter():
+    formatter = CompactJSONFormatter(messages=MessageRegistry())
+
+    lines = []
+    for n in range(2):
+        record = loglady.processors.add_call_info(dict(msg="hello", n=n))
+        lines.extend(json.loads(line) for line in formatter(record).splitlines())
+
+    callsite_entry, msg_entry, first, second = lines
+
+    assert callsite_entry["$callsite"] == first["call_id"] == second["call_id"]
+    assert callsite_entry["fn"] == "test_compact_json_formatter"
+    assert msg_entry == {"$msg": 0, "text": "hello"}
+    assert first == dict(call_id=first["call_id"], msg_id=0, n=0)
+    assert second == dict(call_id=first["call_id"], msg_id=0, n=1)
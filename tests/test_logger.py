@@ -2,7 +2,9 @@
 # Published under the standard MIT License.
 # Full text available at: https://opensource.org/licenses/MIT
 
-from loglady import Record
+import pytest
+
+from loglady import LevelTree, Record
 from loglady.logger import Logger
 
 
@@ -73,3 +75,51 @@ def test_methods_with_context():
 
     log.log("hello")
     assert relay.records.pop() == dict(msg="hello", context_a=42)
+
+
+def test_level_tree():
+    levels = LevelTree({"db": "warning", "db.pool": "debug", "": "info"})
+
+    assert levels.threshold("db") == 30
+    assert levels.threshold("db.migrations") == 30
+    assert levels.threshold("db.pool") == 10
+    assert levels.threshold("db.pool.conn") == 10
+    assert levels.threshold("http") == 20
+    assert levels.threshold("dbx") == 20
+
+    levels.set("db.pool", None)
+    levels.set("", "notset")
+    assert levels.threshold("db.pool.conn") == 30
+    assert levels.threshold("http") == 0
+    assert levels.levels == {"db": "warning", "": "notset"}
+
+    with pytest.raises(ValueError, match="unknown level"):
+        levels.set("db", "loud")
+
+
+def test_named_loggers():
+    relay = RelayStub()
+    levels = LevelTree({"db": "warning", "db.pool": "debug"})
+    root = Logger(_relay=relay, _thresholds=levels)
+
+    db = root.bind(name="db")
+    pool = db.bind(name="db.pool", size=4)
+
+    db.info("dropped")
+    db.warning("kept")
+    pool.debug("kept too")
+    root.debug("unnamed loggers aren't filtered")
+
+    assert [r["msg"] for r in relay.records] == ["kept", "kept too", "unnamed loggers aren't filtered"]
+    assert relay.records[1] == dict(name="db.pool", size=4, level="debug", msg="kept too")
+
+    # Loggers that already exist follow changes to the levels.
+    relay.records.clear()
+    levels.set("db", "debug")
+    db.info("no longer dropped")
+    assert [r["msg"] for r in relay.records] == ["no longer dropped"]
+
+    relay.records.clear()
+    levels.set("db", "error")
+    db.unbind("name").info("unbound from the name")
+    assert [r["msg"] for r in relay.records] == ["unbound from the name"]
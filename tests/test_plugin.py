@@ -2,7 +2,20 @@
 # Published under the standard MIT License.
 # Full text available at: https://opensource.org/licenses/MIT
 
+import re
+import sys
+import threading
+
+import pytest
+from rich.text import Text
+
 import loglady
+from loglady import CaptureDestination, Manager, SyncTransport, config
+from loglady.pytest import (
+    _DeferredCapturedOutput,  # pyright: ignore[reportPrivateUsage]
+    _render_serialized,  # pyright: ignore[reportPrivateUsage]
+    _Renderer,  # pyright: ignore[reportPrivateUsage]
+)
 
 from .utils import assert_dict_subset
 
@@ -61,3 +74,133 @@ def test_capture_renders_on_teardown_failure(pytester):
     result.stdout.fnmatch_lines(["*Captured [*]loglady[*] setup*", "*fixture before*"])
     result.stdout.fnmatch_lines(["*Captured [*]loglady[*] call*", "*within test*"])
     result.stdout.fnmatch_lines(["*Captured [*]loglady[*] teardown*", "*fixture after before raise*"])
+
+
+def test_capture_find(loglady_capture):
+    loglady.info("Hello!", user_id=1)
+    loglady.error("Oh no!", user_id=1)
+    loglady.error("Oh no!", user_id=2)
+
+    assert len(loglady_capture.find(level="error", user_id=1)) == 1
+    assert loglady_capture.count_by("level") == dict(info=1, error=2)
+    assert loglady_capture.count_by("user_id") == {1: 2, 2: 1}
+
+    loglady_capture.clear()
+    loglady.info("Again!", user_id=3)
+
+    assert [r["msg"] for r in loglady_capture] == ["Again!"]
+    assert loglady_capture.find(user_id=1) == []
+    assert loglady_capture.count_by("level") == dict(info=1)
+
+
+def test_context_local_capture(pytester):
+    pytester.copy_example("tests/scripts/deferred_capture.py")
+
+    result = pytester.runpytest("--loglady-context-local-capture", "deferred_capture.py::test_failing")
+
+    result.stdout.fnmatch_lines("*1 failed*")
+    result.stdout.fnmatch_lines(["*Captured [*]loglady[*] setup*", "*fixture before*"])
+    result.stdout.fnmatch_lines(["*Captured [*]loglady[*] call*", "*within test*"])
+
+
+def test_lean_capture(pytester):
+    pytester.copy_example("tests/scripts/deferred_capture.py")
+
+    result = pytester.runpytest("--loglady-lean-capture", "--color=no", "deferred_capture.py")
+
+    result.stdout.fnmatch_lines("*1 failed, 2 passed, 2 errors*")
+    # Call info is only worked out when the failed test's logs are rendered.
+    result.stdout.fnmatch_lines(["*Captured [*]loglady[*] call*", "*within test*test_failing()*"])
+    result.stdout.fnmatch_lines(["*Captured [*]loglady[*] teardown*", "*fixture after*log_before_after()*"])
+
+
+def test_lean_capture_fixture(pytester):
+    pytester.makepyfile(
+        """
+        import loglady
+
+        def test_fixture(loglady_capture):
+            loglady.info("Hello!", icon="v")
+            assert loglady_capture[0]["call_fn"] == "test_fixture"
+            assert loglady_capture[0]["icon"] == "✓"
+            assert "call_site" not in loglady_capture[0]
+        """
+    )
+
+    result = pytester.runpytest("--loglady-lean-capture")
+
+    result.stdout.fnmatch_lines("*1 passed*")
+
+
+def test_xdist_capture(pytester):
+    pytest.importorskip("xdist")
+    pytester.copy_example("tests/scripts/deferred_capture.py")
+
+    result = pytester.runpytest_subprocess("-n", "2", "--color=no", "deferred_capture.py")
+
+    result.stdout.fnmatch_lines("*1 failed, 2 passed, 2 errors*")
+    result.stdout.fnmatch_lines(["*Captured [*]loglady[*] call*", "*within test*test_failing()*"])
+    result.stdout.fnmatch_lines(["*Captured [*]loglady[*] teardown*", "*fixture after*log_before_after()*"])
+    result.stdout.no_fnmatch_line("*Loglady did not format these records*")
+
+
+def test_serialized_capture_renders_exceptions():
+    capture = CaptureDestination()
+    try:
+        raise ValueError("oops")  # noqa: EM101, TRY301
+    except ValueError:
+        capture(dict(msg="it broke", level="error", exception=sys.exc_info(), unpicklable=lambda: None))
+
+    deferred = _DeferredCapturedOutput.create(capture)
+    restored = _DeferredCapturedOutput.from_serialized(deferred.data, deferred.serialize())
+    rendered = restored.render(use_color=False)
+
+    assert "it broke" in rendered
+    assert "ValueError: oops" in rendered
+    assert "unpicklable=" in rendered
+
+
+def test_serialized_capture_renders_like_the_original():
+    capture = CaptureDestination()
+    manager = Manager(transport=SyncTransport(capture), processors=config.DEFAULT_PROCESSORS)
+    logger = manager.logger()
+    lock = threading.Lock()
+    try:
+        raise ValueError("oops")  # noqa: EM101, TRY301
+    except ValueError:
+        logger.exception("it broke", lock=lock, n=1)
+
+    deferred = _DeferredCapturedOutput.create(capture)
+    payload = deferred.serialize()
+    width = _Renderer(use_color=True).console.width
+
+    serial = deferred.render(use_color=True)
+    parallel = _render_serialized(deferred.data, payload, use_color=True, width=width)
+
+    assert "lock=<unlocked" in Text.from_ansi(serial).plain
+    assert "ValueError: oops" in Text.from_ansi(serial).plain
+    # Rich numbers the hyperlinks to source files differently in each process, but everything else is the same.
+    assert re.sub(r"id=\d+;", "", parallel) == re.sub(r"id=\d+;", "", serial)
+
+
+def test_parallel_rendering(pytester):
+    pytester.makepyfile(
+        """
+        import pytest
+        import loglady
+
+        @pytest.mark.parametrize("n", range(2))
+        def test_fails(n):
+            for i in range(300):
+                loglady.info("working on it", n=n, i=i)
+            loglady.info("done", n=n)
+            assert False
+        """
+    )
+
+    result = pytester.runpytest_subprocess("--loglady-render-workers=2", "--color=no")
+
+    result.stdout.fnmatch_lines("*2 failed*")
+    result.stdout.fnmatch_lines(["*test_fails?0?*", "*Captured [*]loglady[*] call*", "*done n=0*"])
+    result.stdout.fnmatch_lines(["*test_fails?1?*", "*Captured [*]loglady[*] call*", "*done n=1*"])
+    result.stdout.no_fnmatch_line("*CaptureRenderWarning*")
@@ -54,3 +54,19 @@ def test_add_call_info_with_invisible_fn():
     assert record.get("call_fn") == "test_add_call_info_with_invisible_fn"
     assert record.get("call_filename") == __file__
     assert record.get("call_module") == __name__
+
+
+def test_add_lazy_call_info():
+    def invisible_fn():
+        __tracebackhide__ = True
+        return loglady.processors.add_lazy_call_info(dict())
+
+    record = invisible_fn()
+    assert "call_fn" not in record
+
+    record = loglady.processors.resolve_call_info(record)
+
+    assert "call_site" not in record
+    assert record.get("call_fn") == "test_add_lazy_call_info"
+    assert record.get("call_filename") == __file__
+    assert record.get("call_module") == __name__
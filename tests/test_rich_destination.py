@@ -0,0 +1,401 @@
+# Copyright (c) 2025 Alethea Katherine Flowers.
+# Published under the standard MIT License.
+# Full text available at: https://opensource.org/licenses/MIT
+
+import datetime
+import io
+import sys
+import time
+import warnings
+from decimal import Decimal
+from typing import override
+
+import pytest
+import rich.color
+import rich.console
+import rich.style
+import rich.theme
+from rich.text import Text
+
+from loglady import RichConsoleDestination
+from loglady.rich import FloodSummarizer, RenderPool, _stacktrace, offload
+from loglady.rich.destination import DEFAULT_THEME, make_default_formatters
+from loglady.rich.formatters import (
+    ExceptionFormatter,
+    Formatter,
+    MessageFormatter,
+    RecordItemsFormatter,
+    StacktraceFormatter,
+)
+from loglady.warnings import DestinationErrorWarning, RenderPoolWarning
+
+
+def _render(records, **kwargs) -> list[str]:
+    out = io.StringIO()
+    console = rich.console.Console(file=out, width=80, force_terminal=False)
+    dest = RichConsoleDestination(console=console, **kwargs)
+    for record in records:
+        dest(record)
+    return out.getvalue().splitlines()
+
+
+def _record(msg, level="info", **extra):
+    return dict(
+        msg=msg,
+        level=level,
+        timestamp=datetime.datetime(2024, 3, 15, 12, 30),  # noqa: DTZ001
+        call_fn="handler",
+        call_filename="app.py",
+        call_module="app",
+        call_lineno=42,
+        **extra,
+    )
+
+
+def test_fast_mode_single_line():
+    (line,) = _render([_record("hello", user=1)], fast=True)
+
+    assert line.startswith("12:30 █ hello user=1 ")
+    assert "handler()" in line
+    assert len(line.rstrip()) <= 80
+
+
+def test_fast_mode_matches_table_layout():
+    records = [
+        _record("hello", user=1),
+        _record("again", user=2),
+        _record("uh oh", level="error"),
+        _record("elsewhere", thread_id=7, thread_name="worker"),
+    ]
+
+    fast = _render([r.copy() for r in records], fast=True)
+    table = _render([r.copy() for r in records])
+
+    assert fast == table
+
+
+def test_fast_mode_falls_back_for_exceptions_and_long_messages():
+    try:
+        raise ValueError("oops")  # noqa: EM101, TRY301
+    except ValueError as err:
+        record = _record("it broke", exception=(type(err), err, err.__traceback__))
+
+    lines = _render([record, _record("word " * 30)], fast=True)
+
+    assert any("ValueError: oops" in line for line in lines)
+    assert any(line.startswith("      ") and "word" in line for line in lines)
+
+
+def test_batch_matches_individual_rendering():
+    records = [_record("hello", user=n) for n in range(5)]
+
+    out = io.StringIO()
+    console = rich.console.Console(file=out, width=80, force_terminal=False)
+    RichConsoleDestination(console=console).batch([r.copy() for r in records])
+
+    assert out.getvalue().splitlines() == _render([r.copy() for r in records])
+
+
+def test_batch_skips_records_that_fail():
+    formatters: dict[str, Formatter] = {
+        **make_default_formatters(),
+        # Returns whatever the message is, so a non-string message can't be printed.
+        "message": lambda record: record.pop("msg"),
+    }
+
+    out = io.StringIO()
+    console = rich.console.Console(file=out, width=80, force_terminal=False)
+    dest = RichConsoleDestination(console=console, formatters=formatters)
+
+    with pytest.warns(DestinationErrorWarning):
+        dest.batch([_record("before"), _record(42), _record("after")])
+
+    output = out.getvalue()
+    assert "before" in output
+    assert "after" in output
+
+
+def test_message_markup_is_cached():
+    out = io.StringIO()
+    console = rich.console.Console(file=out, width=80, force_terminal=False)
+    dest = RichConsoleDestination(console=console)
+
+    for n in range(10):
+        dest(_record("[bold]hello[/bold]", n=n))
+    dest(_record("[bold]goodbye[/bold]"))
+
+    assert dest.stats["message.markup_parses"] == 2
+    assert "[bold]" not in out.getvalue()
+
+
+def test_message_without_markup():
+    out = io.StringIO()
+    console = rich.console.Console(file=out, width=80, force_terminal=False)
+    formatters = make_default_formatters()
+    formatters["message"] = MessageFormatter(markup=False)
+    dest = RichConsoleDestination(console=console, formatters=formatters)
+
+    dest(_record("[bold]hello[/bold]"))
+
+    assert "[bold]hello[/bold]" in out.getvalue()
+    assert dest.stats["message.markup_parses"] == 0
+
+
+def _raise_and_capture(n: int):
+    try:
+        raise ValueError(f"oops {n}")  # noqa: EM102, TRY003, TRY301
+    except ValueError as err:
+        return (type(err), err, err.__traceback__)
+
+
+def test_exception_dedupe():
+    formatter = ExceptionFormatter(dedupe_window=60)
+
+    first = formatter(dict(exception=_raise_and_capture(1)))
+    second = formatter(dict(exception=_raise_and_capture(2)))
+    third = formatter(dict(exception=_raise_and_capture(3)))
+
+    assert not isinstance(first, Text)
+    assert isinstance(second, Text)
+    assert second.plain == "same traceback as #1 (×2)"  # noqa: RUF001
+    assert isinstance(third, Text)
+    assert third.plain == "same traceback as #1 (×3)"  # noqa: RUF001
+    assert formatter.stats == dict(exceptions_rendered=1, exceptions_deduplicated=2)
+
+    try:
+        raise RuntimeError("different")  # noqa: EM101, TRY301
+    except RuntimeError as err:
+        different = formatter(dict(exception=(type(err), err, err.__traceback__)))
+
+    assert not isinstance(different, Text)
+    assert formatter.stats["exceptions_rendered"] == 2
+
+
+def test_exception_dedupe_window_and_bound():
+    formatter = ExceptionFormatter(dedupe_window=0, dedupe_max_entries=1)
+
+    formatter(dict(exception=_raise_and_capture(1)))
+    time.sleep(0.01)
+    formatter(dict(exception=_raise_and_capture(2)))
+
+    assert formatter.stats["exceptions_rendered"] == 2
+    assert len(formatter._seen) == 1  # pyright: ignore[reportPrivateUsage]
+
+
+def test_stacktrace_source_is_cached():
+    _stacktrace._SOURCE_CACHE.clear()  # pyright: ignore[reportPrivateUsage]
+
+    def render() -> str:
+        out = io.StringIO()
+        console = rich.console.Console(file=out, width=100, force_terminal=False, theme=DEFAULT_THEME)
+        console.print(_stacktrace.Stacktrace(sys._getframe()))  # pyright: ignore[reportPrivateUsage]
+        return out.getvalue()
+
+    rendered = []
+    cache_sizes = []
+    for _ in range(2):
+        rendered.append(render())
+        cache_sizes.append(len(_stacktrace._SOURCE_CACHE))  # pyright: ignore[reportPrivateUsage]
+
+    # Locals differ between the two renders, but the source shown is the same.
+    assert all("❱" in text and "rendered.append(render())" in text for text in rendered)
+    assert cache_sizes[0] > 0
+    assert cache_sizes[0] == cache_sizes[1]
+
+
+def test_record_items_are_bounded():
+    formatter = RecordItemsFormatter(max_length=20, max_items=3, max_depth=2)
+
+    text = formatter(dict(s="x" * 100, l=list(range(100)), d=dict(a=dict(b=dict(c=1))))).plain
+
+    assert "x" * 21 not in text
+    assert "l=[0, 1, 2, ...]" in text
+    assert "d={'a': {'b': {...}}}" in text
+
+
+def test_record_items_cache_reprs():
+    formatter = RecordItemsFormatter()
+
+    for n in range(5):
+        formatter(dict(n=n, s="str", point=(1, 2), amount=Decimal("3.14"), items=[1, 2]))
+
+    # Strings and numbers skip the highlighter, and the other values are only highlighted once.
+    assert formatter.stats["reprs_highlighted"] == 3
+
+
+def test_record_items_cache_keeps_equal_values_apart():
+    formatter = RecordItemsFormatter()
+    utc = datetime.datetime(2025, 1, 1, 12, tzinfo=datetime.UTC)
+    plus_one = utc.astimezone(datetime.timezone(datetime.timedelta(hours=1)))
+
+    first = formatter(dict(point=(1, 2), amount=Decimal("1.0"), when=utc)).plain
+    second = formatter(dict(point=(1.0, 2.0), amount=Decimal("1.00"), when=plus_one)).plain
+
+    assert "point=(1.0, 2.0)" in second
+    assert "amount=Decimal('1.00')" in second
+    assert "13, 0" in second
+    assert first != second
+
+
+def _print(renderable) -> str:
+    out = io.StringIO()
+    console = rich.console.Console(file=out, width=100, force_terminal=False, theme=DEFAULT_THEME)
+    console.print(renderable)
+    return out.getvalue()
+
+
+def test_render_pool():
+    exc = _raise_and_capture(1)
+
+    with RenderPool() as pool:
+        offloaded_exception = _print(ExceptionFormatter(render_pool=pool)(dict(exception=exc)))
+        offloaded_stack = _print(StacktraceFormatter(render_pool=pool)(dict(stacktrace=sys._getframe())))  # pyright: ignore[reportPrivateUsage]
+
+    assert offloaded_exception == _print(ExceptionFormatter()(dict(exception=exc)))
+    assert "ValueError: oops 1" in offloaded_exception
+    assert "Stacktrace" in offloaded_stack
+    assert "test_render_pool" in offloaded_stack
+    assert "offloaded_exception = " in offloaded_stack
+
+
+def test_render_pool_uses_console_theme():
+    exc = _raise_and_capture(1)
+    theme = rich.theme.Theme({"traceback.border": "blue", "traceback.exc_type": "bold magenta"})
+
+    def print_in_color(renderable) -> str:
+        out = io.StringIO()
+        console = rich.console.Console(file=out, width=100, color_system="truecolor", theme=DEFAULT_THEME)
+        console.push_theme(theme)
+        console.print(renderable)
+        return out.getvalue()
+
+    with RenderPool() as pool, warnings.catch_warnings():
+        warnings.simplefilter("error", RenderPoolWarning)
+        offloaded = Text.from_ansi(print_in_color(ExceptionFormatter(render_pool=pool)(dict(exception=exc))))
+
+    # Rich remembers a style's escape codes for the first color system it was printed with, so depending on what
+    # ran before, this process's output can have different escape codes than the worker's for the same styles.
+    assert offloaded.plain == Text.from_ansi(print_in_color(ExceptionFormatter()(dict(exception=exc)))).plain
+
+    def style_of(substring: str) -> rich.style.Style:
+        return offloaded.get_style_at_offset(rich.console.Console(), offloaded.plain.index(substring))
+
+    assert style_of("╭").color == rich.color.Color.from_ansi(4)  # blue
+    assert style_of("ValueError: oops 1").color == rich.color.Color.from_ansi(5)  # magenta
+    assert style_of("ValueError: oops 1").bold
+
+
+def test_render_pool_styles_are_cached_until_the_theme_changes():
+    changed_styles = offload._changed_styles  # pyright: ignore[reportPrivateUsage]
+    console = rich.console.Console(file=io.StringIO(), theme=DEFAULT_THEME)
+
+    styles = changed_styles(console)
+    assert styles == {}
+    assert changed_styles(console) is styles
+
+    console.push_theme(rich.theme.Theme({"traceback.border": "blue"}, inherit=False))
+    assert changed_styles(console) == {"traceback.border": rich.style.Style.parse("blue")}
+
+    console.pop_theme()
+    assert changed_styles(console) == {}
+
+
+class _BrokenRenderPool(RenderPool):
+    @override
+    def submit(self, renderable, *, width, color_system, styles=None):
+        raise RuntimeError("broken")  # noqa: EM101
+
+
+def test_render_pool_falls_back_to_in_process():
+    formatter = ExceptionFormatter(render_pool=_BrokenRenderPool())
+
+    with pytest.warns(RenderPoolWarning):
+        rendered = _print(formatter(dict(exception=_raise_and_capture(1))))
+
+    assert "ValueError: oops 1" in rendered
+
+
+class _FakeClock:
+    def __init__(self):
+        super().__init__()
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_flood_summarizer():
+    clock = _FakeClock()
+    summarizer = FloodSummarizer(threshold=10, interval=1.0, samples=2, clock=clock)
+    out = io.StringIO()
+    console = rich.console.Console(file=out, width=200, force_terminal=False, theme=DEFAULT_THEME)
+    dest = RichConsoleDestination(console=console, summarizer=summarizer)
+
+    # A flood: the first ten records are printed, then the rest are summarized.
+    for n in range(50):
+        clock.now = n * 0.01
+        dest(_record(f"flood {n}", level="debug" if n % 2 else "info"))
+
+    printed = out.getvalue()
+    assert "flood 9 " in printed
+    assert "flood 10 " not in printed
+    assert summarizer.summarizing
+
+    # The next interval starts summarizing since the last one was a flood, but its rate is low, so once it's over
+    # records are printed normally again.
+    clock.now = 2.0
+    dest(_record("quiet"))
+    clock.now = 3.5
+    dest(_record("quieter"))
+
+    lines = out.getvalue().splitlines()
+    summary = next(n for n, line in enumerate(lines) if line.startswith("⋯ 40 records"))
+    assert "20 info, 20 debug" in lines[summary]
+    assert lines[summary + 1] == "  top callsites: app.handler:42 ×40"  # noqa: RUF001
+    assert lines[summary + 2 : summary + 4] == ["  e.g. flood 10", "  e.g. flood 11"]
+    assert lines[summary + 4].startswith("⋯ 1 records")
+    assert lines[summary + 6] == "  e.g. quiet"
+    assert "█ quieter" in lines[summary + 7]
+    assert not summarizer.summarizing
+    assert dest.stats["summarizer.records_summarized"] == 41
+
+
+def test_flood_summarizer_flush():
+    clock = _FakeClock()
+    summarizer = FloodSummarizer(threshold=1, interval=10.0, clock=clock)
+    out = io.StringIO()
+    console = rich.console.Console(file=out, width=200, force_terminal=False, theme=DEFAULT_THEME)
+    dest = RichConsoleDestination(console=console, summarizer=summarizer)
+
+    for n in range(30):
+        dest(_record(f"flood {n}"))
+
+    assert "⋯" not in out.getvalue()
+    dest.flush()
+    assert "⋯ 20 records" in out.getvalue()
+
+
+def test_flood_summarizer_prints_warnings_and_errors():
+    clock = _FakeClock()
+    summarizer = FloodSummarizer(threshold=1, interval=10.0, clock=clock)
+    out = io.StringIO()
+    console = rich.console.Console(file=out, width=200, force_terminal=False, theme=DEFAULT_THEME)
+    dest = RichConsoleDestination(console=console, summarizer=summarizer)
+
+    for n in range(30):
+        dest(_record(f"flood {n}", level="debug"))
+        if n == 20:
+            dest(_record("it broke", level="error"))
+            dest(_record("careful", level="warning"))
+
+    assert summarizer.summarizing
+    printed = out.getvalue()
+    assert "it broke" in printed
+    assert "careful" in printed
+    assert "flood 20" not in printed
+
+    # Only the debug records are counted in the summary.
+    dest.flush()
+    summary = next(line for line in out.getvalue().splitlines() if line.startswith("⋯"))
+    assert summary.startswith("⋯ 20 records")
+    assert summary.endswith(": 20 debug")
@@ -0,0 +1,87 @@
+# Copyright (c) 2025 Alethea Katherine Flowers.
+# Published under the standard MIT License.
+# Full text available at: https://opensource.org/licenses/MIT
+
+import pytest
+
+from loglady import CaptureDestination, Filter, FilteredDestination
+from loglady.routing import RoutingTable
+from loglady.transport import SyncTransport
+
+
+def test_filter():
+    record_filter = Filter(
+        min_level="warning", has_keys=frozenset({"user"}), equals=dict(env="prod"), module_prefix="db."
+    )
+
+    assert record_filter(dict(level="error", user=1, env="prod", call_module="db.pool"))
+    assert not record_filter(dict(level="info", user=1, env="prod", call_module="db.pool"))
+    assert not record_filter(dict(level="error", env="prod", call_module="db.pool"))
+    assert not record_filter(dict(level="error", user=1, env="dev", call_module="db.pool"))
+    assert not record_filter(dict(level="error", user=1, env="prod", call_module="web"))
+    assert not record_filter(dict(user=1, env="prod", call_module="db.pool"))
+
+
+def test_routing_table_resolves_levels_ahead_of_time():
+    everything = CaptureDestination()
+    warnings = CaptureDestination()
+    db_errors = CaptureDestination()
+
+    table = RoutingTable(
+        [
+            everything,
+            FilteredDestination(warnings, Filter(min_level="warning")),
+            FilteredDestination(db_errors, Filter(min_level="error", module_prefix="db")),
+        ]
+    )
+
+    assert table.routes(dict(level="debug")) == ((None, everything),)
+    assert table.routes(dict(level="warning")) == ((None, everything), (None, warnings))
+    assert [dest for _, dest in table.routes(dict(level="error"))] == [everything, warnings, db_errors]
+
+
+def test_transport_routes_records():
+    debug = CaptureDestination()
+    warnings = CaptureDestination()
+    alerts = CaptureDestination()
+
+    transport = SyncTransport(
+        [
+            debug,
+            FilteredDestination(warnings, Filter(min_level="warning")),
+            FilteredDestination(alerts, Filter(min_level="error", equals=dict(alert=True))),
+        ]
+    )
+
+    transport.relay(dict(msg="a", level="debug"))
+    transport.relay(dict(msg="b", level="warning"))
+    transport.relay(dict(msg="c", level="error"))
+    transport.relay(dict(msg="d", level="error", alert=True))
+
+    assert [r["msg"] for r in debug.records] == ["a", "b", "c", "d"]
+    assert [r["msg"] for r in warnings.records] == ["b", "c", "d"]
+    assert [r["msg"] for r in alerts.records] == ["d"]
+
+    # Replacing the destinations rebuilds the routing table.
+    destinations = [alerts]
+    transport.destinations = destinations
+    transport.relay(dict(msg="e", level="error", alert=True))
+    assert [r["msg"] for r in alerts.records] == ["d", "e"]
+    assert len(debug.records) == 4
+
+    # Changing them in place needs the routing table to be rebuilt explicitly.
+    destinations.append(debug)
+    transport.invalidate_routes()
+    transport.relay(dict(msg="f", level="debug"))
+    assert [r["msg"] for r in debug.records] == ["a", "b", "c", "d", "f"]
+
+    # So does replacing them, even with the same list.
+    destinations.remove(debug)
+    transport.replace_destinations(destinations)
+    transport.relay(dict(msg="g", level="debug"))
+    assert [r["msg"] for r in debug.records] == ["a", "b", "c", "d", "f"]
+
+
+def test_filter_rejects_unknown_levels():
+    with pytest.raises(ValueError, match="unknown level 'critical'"):
+        _ = Filter(min_level="critical")
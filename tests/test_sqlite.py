@@ -0,0 +1,121 @@
+# Copyright (c) 2025 Alethea Katherine Flowers.
+# Published under the standard MIT License.
+# Full text available at: https://opensource.org/licenses/MIT
+
+import datetime
+import subprocess
+import sys
+
+import pytest
+
+import loglady
+from loglady.sqlite import SQLiteDestination, query
+from loglady.warnings import DestinationErrorWarning
+
+
+def _timestamp(minutes_ago: int) -> datetime.datetime:
+    return datetime.datetime.now().astimezone(None) - datetime.timedelta(minutes=minutes_ago)
+
+
+def test_write_and_query(tmp_path):
+    path = tmp_path / "logs.sqlite"
+    dest = SQLiteDestination(path, batch_size=2)
+
+    dest(dict(msg="old", level="error", timestamp=_timestamp(60), call_module="db.pool", user=1))
+    dest(dict(msg="debug", level="debug", timestamp=_timestamp(5), call_module="db.pool"))
+    dest(dict(msg="recent", level="warning", timestamp=_timestamp(1), call_module="web", thread_id=42))
+
+    # The third record is still buffered.
+    assert [r["msg"] for r in query(path)] == ["old", "debug"]
+
+    dest.flush()
+
+    assert [r["msg"] for r in query(path)] == ["old", "debug", "recent"]
+    assert [r["msg"] for r in query(path, level="warning")] == ["old", "recent"]
+    assert [r["msg"] for r in query(path, since=_timestamp(10))] == ["debug", "recent"]
+    assert [r["msg"] for r in query(path, module="db")] == ["old", "debug"]
+    assert [r["msg"] for r in query(path, thread_id=42)] == ["recent"]
+    assert [r["msg"] for r in query(path, limit=1)] == ["old"]
+
+    record = next(query(path))
+    assert record["user"] == 1
+    assert record["level"] == "error"
+    assert isinstance(record["timestamp"], datetime.datetime)
+
+    dest.close()
+
+
+def test_exception_is_stored_as_text(tmp_path):
+    path = tmp_path / "logs.sqlite"
+    dest = SQLiteDestination(path)
+    transport = loglady.SyncTransport(dest)
+    manager = loglady.Manager(transport=transport, processors=loglady.DEFAULT_PROCESSORS)
+
+    try:
+        raise ValueError("oops")  # noqa: EM101, TRY301
+    except ValueError:
+        manager.logger().exception("it broke")
+
+    manager.flush()
+
+    (record,) = query(path)
+    assert record["msg"] == "it broke"
+    assert "ValueError: oops" in record["exception"]
+    assert record["call_fn"] == "test_exception_is_stored_as_text"
+
+
+def test_query_cli(tmp_path):
+    path = tmp_path / "logs.sqlite"
+    dest = SQLiteDestination(path)
+    dest(dict(msg="too old", level="error", timestamp=_timestamp(60)))
+    dest(dict(msg="not important", level="info", timestamp=_timestamp(1)))
+    dest(dict(msg="find me", level="error", timestamp=_timestamp(1), user=7))
+    dest.close()
+
+    result = subprocess.run(
+        [sys.executable, "-m", "loglady", "query", str(path), "--level", "error", "--since", "10m"],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+
+    assert "find me user=7" in result.stdout
+    assert "too old" not in result.stdout
+    assert "not important" not in result.stdout
+
+
+def test_bad_rows_are_dropped(tmp_path):
+    path = tmp_path / "logs.sqlite"
+    dest = SQLiteDestination(path, batch_size=10)
+
+    dest(dict(msg="before", level="info"))
+    # Too big for an SQLite integer.
+    dest(dict(msg="bad", level="info", thread_id=2**70))
+    # Not something SQLite can store, so it's stored as a string.
+    dest(dict(msg="list", level="info", call_module=["a", "b"]))
+
+    with pytest.warns(DestinationErrorWarning):
+        dest.flush()
+
+    dest(dict(msg="after", level="info"))
+    dest.flush()
+
+    records = list(query(path))
+    assert [r["msg"] for r in records] == ["before", "list", "after"]
+    assert records[1]["call_module"] == "['a', 'b']"
+
+    dest.close()
+
+
+def test_batch_skips_records_that_cant_be_converted(tmp_path):
+    path = tmp_path / "logs.sqlite"
+    dest = SQLiteDestination(path, batch_size=10)
+
+    # JSON objects can't have tuples as keys.
+    with pytest.warns(DestinationErrorWarning):
+        dest.batch([dict(msg="a"), dict(msg="b", data={(1, 2): 3}), dict(msg="c")])
+    dest.flush()
+
+    assert [r["msg"] for r in query(path)] == ["a", "c"]
+
+    dest.close()
@@ -0,0 +1,105 @@
+# Copyright (c) 2025 Alethea Katherine Flowers.
+# Published under the standard MIT License.
+# Full text available at: https://opensource.org/licenses/MIT
+
+import os
+import signal
+
+import pytest
+
+from loglady import CallsiteSwitches, CaptureDestination, Manager, SyncTransport
+from loglady.interning import CallsiteRegistry
+from loglady.warnings import SwitchesReloadWarning
+
+
+def _first(switches: CallsiteSwitches, level: str = "debug") -> bool:
+    return switches.allows(dict(msg="hello", level=level))
+
+
+def _second(switches: CallsiteSwitches, level: str = "debug") -> bool:
+    return switches.allows(dict(msg="hello", level=level))
+
+
+_SECOND_LINENO = _second.__code__.co_firstlineno + 1
+
+
+def test_callsite_switches():
+    switches = CallsiteSwitches(callsites=CallsiteRegistry())
+
+    # Debug records are off by default, everything else always gets through.
+    assert not _first(switches)
+    assert not _second(switches)
+    assert _first(switches, level="info")
+
+    switches.enable("*/test_switches.py")
+    assert _first(switches)
+    assert _second(switches)
+
+    switches.disable(f"*/test_switches.py:{_SECOND_LINENO}")
+    assert _first(switches)
+    assert not _second(switches)
+
+    assert switches.rules == ["enable */test_switches.py", f"disable */test_switches.py:{_SECOND_LINENO}"]
+
+    switches.reset()
+    assert not _first(switches)
+
+
+def test_switched_off_callsites_skip_processors():
+    processed = []
+
+    def processor(record):
+        processed.append(record["msg"])
+        return record
+
+    dest = CaptureDestination()
+    switches = CallsiteSwitches(callsites=CallsiteRegistry())
+    log = Manager(transport=SyncTransport(dest), processors=[processor], switches=switches).logger()
+
+    log.debug("off")
+    log.info("always on")
+    switches.enable("*/test_switches.py")
+    log.debug("on")
+
+    assert processed == ["always on", "on"]
+    assert [r["msg"] for r in dest.records] == ["always on", "on"]
+
+
+def test_callsite_switches_control_file(tmp_path):
+    switches = CallsiteSwitches(callsites=CallsiteRegistry())
+    control = tmp_path / "callsites"
+
+    switches.load(control)
+    assert not _first(switches)
+
+    control.write_text("# Turn on this test.\n\nenable */test_switches.py\n")
+    switches.load(control)
+    assert _first(switches)
+
+    control.write_text("turn on everything\n")
+    with pytest.raises(ValueError, match="callsites:1"):
+        switches.load(control)
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGUSR1"), reason="needs SIGUSR1")
+def test_callsite_switches_signal_handler(tmp_path):
+    switches = CallsiteSwitches(callsites=CallsiteRegistry())
+    control = tmp_path / "callsites"
+
+    previous = signal.getsignal(signal.SIGUSR1)
+    try:
+        switches.install_signal_handler(control)
+        assert not _first(switches)
+
+        control.write_text("enable */test_switches.py\n")
+        os.kill(os.getpid(), signal.SIGUSR1)
+        assert _first(switches)
+
+        # A bad control file keeps the current rules.
+        control.write_text("turn on everything\n")
+        with pytest.warns(SwitchesReloadWarning, match="callsites:1"):
+            os.kill(os.getpid(), signal.SIGUSR1)
+        assert switches.rules == ["enable */test_switches.py"]
+        assert _first(switches)
+    finally:
+        signal.signal(signal.SIGUSR1, previous)
@@ -2,10 +2,15 @@
 # Published under the standard MIT License.
 # Full text available at: https://opensource.org/licenses/MIT
 
+import threading
+import time
 from typing import override
 
+import pytest
+
 from loglady import Destination, Record
 from loglady.transport import SyncTransport, ThreadedTransport
+from loglady.warnings import BackgroundThreadWarning, DestinationErrorWarning
 
 
 class StubDestination(Destination):
@@ -52,3 +57,186 @@ def test_threaded_transport():
     assert dest.records.pop() == dict(a=42, b="hello!")
 
     transp.shutdown()
+
+
+class BatchingStubDestination(StubDestination):
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+
+    @override
+    def batch(self, records):
+        self.batches.append(len(records))
+        super().batch(records)
+
+
+def test_threaded_transport_delivers_batches():
+    transp = ThreadedTransport(max_batch_size=4)
+    dest = BatchingStubDestination()
+    transp.destinations = [dest]
+
+    for n in range(10):
+        transp.relay(dict(n=n))
+
+    transp.start()
+    transp.flush()
+
+    assert [r["n"] for r in dest.records] == list(range(10))
+    assert dest.batches == [4, 4, 2]
+
+    transp.shutdown()
+
+
+def test_sync_transport_replace_destinations():
+    transp = SyncTransport()
+    old, new = StubDestination(), StubDestination()
+    transp.destinations = [old]
+
+    transp.relay(dict(n=0))
+    transp.replace_destinations([new])
+    transp.relay(dict(n=1))
+
+    assert old.records == [dict(n=0)]
+    assert new.records == [dict(n=1)]
+
+
+def test_threaded_transport_replace_destinations_under_load():
+    transp = ThreadedTransport(max_batch_size=16)
+    old, new = StubDestination(), StubDestination()
+    transp.destinations = [old]
+    transp.start()
+
+    relayed = 0
+    started, stop = threading.Event(), threading.Event()
+
+    def produce():
+        nonlocal relayed
+        while not stop.is_set():
+            transp.relay(dict(n=relayed))
+            relayed += 1
+            if relayed == 5_000:
+                started.set()
+
+    producer = threading.Thread(target=produce)
+    producer.start()
+    _ = started.wait()
+
+    transp.replace_destinations([new])
+    assert transp.destinations == [new]
+
+    # Keep going for a bit, so that the new destinations get some records however the threads were scheduled.
+    swapped_at = relayed
+    while relayed < swapped_at + 5_000:
+        time.sleep(0.001)
+    stop.set()
+
+    producer.join()
+    transp.flush()
+    transp.shutdown()
+
+    # Every record was delivered exactly once, and the swap happened at a single point in the stream.
+    assert old.records
+    assert new.records
+    assert [r["n"] for r in old.records + new.records] == list(range(relayed))
+
+
+def test_threaded_transport_replace_destinations_before_start():
+    transp = ThreadedTransport()
+    new = StubDestination()
+
+    transp.replace_destinations([new])
+    assert transp.destinations == [new]
+
+
+class ReplacingStubDestination(StubDestination):
+    def __init__(self, transp: ThreadedTransport, replacement: Destination):
+        super().__init__()
+        self.transp = transp
+        self.replacement = replacement
+
+    @override
+    def __call__(self, record: Record):
+        super().__call__(record)
+        self.transp.replace_destinations([self.replacement])
+
+
+def test_threaded_transport_replace_destinations_from_the_thread():
+    transp = ThreadedTransport()
+    new = StubDestination()
+    old = ReplacingStubDestination(transp, new)
+    transp.destinations = [old]
+    transp.start()
+
+    # The thread can't wait for itself, so the swap is queued and happens after the current batch.
+    transp.relay(dict(n=0))
+    transp.flush()
+    transp.relay(dict(n=1))
+    transp.flush()
+    transp.shutdown()
+
+    assert old.records == [dict(n=0)]
+    assert new.records == [dict(n=1)]
+
+
+class BlockingStubDestination(StubDestination):
+    def __init__(self):
+        super().__init__()
+        self.entered = threading.Event()
+        self.unblock = threading.Event()
+
+    @override
+    def __call__(self, record: Record):
+        self.entered.set()
+        _ = self.unblock.wait()
+        super().__call__(record)
+
+
+@pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+def test_threaded_transport_replace_destinations_when_thread_dies():
+    transp = ThreadedTransport()
+    old, new = BlockingStubDestination(), StubDestination()
+    transp.destinations = [old]
+    transp.start()
+
+    # Something that isn't a record or a control item kills the thread once it's done with the first record, before
+    # it gets to the swap.
+    transp.relay(dict(n=0))
+    _ = old.entered.wait()
+    transp.relay(None)  # pyright: ignore[reportArgumentType]
+    threading.Timer(0.2, old.unblock.set).start()
+
+    with pytest.warns(BackgroundThreadWarning):
+        transp.replace_destinations([new], timeout=5)
+
+    assert transp.destinations == [new]
+    assert old.records == [dict(n=0)]
+
+
+class FailingStubDestination(StubDestination):
+    @override
+    def __call__(self, record: Record):
+        if record.get("fail"):
+            raise ValueError("can't output this")  # noqa: EM101, TRY003
+        super().__call__(record)
+
+
+def test_threaded_transport_isolates_failing_records():
+    transp = ThreadedTransport()
+    dest = FailingStubDestination()
+    transp.destinations = [dest]
+
+    transp.relay(dict(n=0))
+    transp.relay(dict(n=1, fail=True))
+    transp.relay(dict(n=2))
+
+    def deliver():
+        transp.start()
+        transp.flush()
+
+    # The records are already queued, so the failure can't be delivered before the warning is being watched for.
+    with pytest.warns(DestinationErrorWarning):
+        deliver()
+
+    assert [r["n"] for r in dest.records] == [0, 2]
+
+    transp.shutdown()